@@ -1,20 +1,31 @@
 import asyncio
 import json
 import os
+import base64
+import hashlib
+import hmac
 import random
 import re
+import secrets
+import sqlite3
+import threading
+import time
+import unicodedata
 import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterable, List, Optional, Union
+from urllib.parse import parse_qs, urlparse
 
 import spotipy
 import yt_dlp
-import requests
+import httpx
 import bcrypt
 from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request as FastAPIRequest
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse, StreamingResponse
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
 from pydantic import BaseModel
 from spotipy.oauth2 import SpotifyClientCredentials
 from google.oauth2.credentials import Credentials
@@ -22,6 +33,11 @@ from google_auth_oauthlib.flow import Flow
 from googleapiclient.discovery import build
 from google.auth.transport.requests import Request as GoogleRequest
 
+try:
+    import orjson  # Encoder JSON rápido (opcional)
+except ImportError:
+    orjson = None
+
 app = FastAPI(title="Music Buzzer API", version="1.0.0")
 
 # Configurar CORS
@@ -155,6 +171,7 @@ class Player(BaseModel):
 
 
 class GameState(BaseModel):
+    version: int = 0
     tracks: List[Track]
     track_order: List[str]
     current_track_id: Optional[str]
@@ -185,13 +202,15 @@ class AdminAuthRequest(BaseModel):
 
 class CloseRoomRequest(BaseModel):
     room_name: str
-    admin_password: str
+    admin_password: Optional[str] = None
+    admin_token: Optional[str] = None  # Token emitido por /admin/auth (alternativa a la contraseña)
 
 
 class BanPlayerRequest(BaseModel):
     room_name: str
     player_id: str
-    admin_password: str
+    admin_password: Optional[str] = None
+    admin_token: Optional[str] = None
 
 
 TRACKS: List[Track] = [
@@ -201,88 +220,342 @@ TRACKS: List[Track] = [
 ]
 
 
-# Archivo para persistir scores
+# Scores persistidos en SQLite (modo WAL), una fila por jugador.
+# La sala por defecto usa SCORES_DB_FILE; cada sala creada tiene su propia base en SCORES_DIR
+SCORES_DB_FILE = Path(os.getenv("SCORES_DB_FILE") or Path(__file__).parent / "scores.db")
+SCORES_DIR = Path(os.getenv("SCORES_DIR") or Path(__file__).parent / "scores")
+# Archivo JSON del formato anterior (se importa una vez si la base está vacía)
 SCORES_FILE = Path(__file__).parent / "scores.json"
+# Tiempo que se conserva el score de un jugador desde su última actualización
+SCORES_TTL_SECONDS = int(os.getenv("SCORES_TTL_SECONDS", str(24 * 60 * 60)))
+# Cada cuánto se borran las filas vencidas y se compacta el WAL
+SCORES_COMPACT_INTERVAL = int(os.getenv("SCORES_COMPACT_INTERVAL", "600"))
+
+
+def normalize_player_name(name: str) -> str:
+    """Clave de búsqueda de un jugador (los nombres no distinguen mayúsculas)"""
+    return name.strip().lower()
+
+
+class ScoreStore:
+    """
+    Scores persistidos, indexados por nombre normalizado y con vencimiento por fila.
+    La tabla se lee una sola vez al abrir; las búsquedas usan el índice en memoria.
+    """
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS scores ("
+            " name_key TEXT PRIMARY KEY,"
+            " id TEXT NOT NULL,"
+            " name TEXT NOT NULL,"
+            " score INTEGER NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS scores_expires_at ON scores (expires_at)")
+        self._conn.commit()
+        self._last_compaction = time.time()
+        # name_key -> {'id', 'name', 'score', 'expires_at'}
+        self._index: Dict[str, Dict] = {}
+        for name_key, player_id, name, score, expires_at in self._conn.execute(
+            "SELECT name_key, id, name, score, expires_at FROM scores WHERE expires_at > ?", (time.time(),)
+        ):
+            self._index[name_key] = {'id': player_id, 'name': name, 'score': score, 'expires_at': expires_at}
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Busca un jugador por nombre (sin tocar disco); retorna None si no existe o venció"""
+        entry = self._index.get(normalize_player_name(name))
+        if not entry or entry['expires_at'] <= time.time():
+            return None
+        return {'id': entry['id'], 'name': entry['name'], 'score': entry['score']}
+
+    def count(self) -> int:
+        now = time.time()
+        return sum(1 for entry in list(self._index.values()) if entry['expires_at'] > now)
+
+    def upsert(self, records: Iterable[Dict]) -> None:
+        """Inserta o actualiza jugadores ({'id', 'name', 'score'}), renovando su vencimiento"""
+        now = time.time()
+        expires_at = now + SCORES_TTL_SECONDS
+        rows = [
+            (normalize_player_name(r['name']), r['id'], r['name'], r['score'], expires_at, now)
+            for r in records
+        ]
+        if not rows:
+            return
+        with self._lock:
+            # Si el jugador ya existía se mantiene su ID original (puede haberse reconectado)
+            self._conn.executemany(
+                "INSERT INTO scores (name_key, id, name, score, expires_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(name_key) DO UPDATE SET "
+                " id = CASE WHEN scores.expires_at <= ? THEN excluded.id ELSE scores.id END,"
+                " name = excluded.name, score = excluded.score, expires_at = excluded.expires_at",
+                rows,
+            )
+            self._conn.commit()
+        for name_key, player_id, name, score, _, _ in rows:
+            existing = self._index.get(name_key)
+            if existing and existing['expires_at'] > now:
+                player_id = existing['id']
+            self._index[name_key] = {'id': player_id, 'name': name, 'score': score, 'expires_at': expires_at}
+        if now - self._last_compaction > SCORES_COMPACT_INTERVAL:
+            self.compact()
+
+    def compact(self) -> None:
+        """Elimina filas vencidas y trunca el WAL"""
+        with self._lock:
+            self._last_compaction = time.time()
+            self._conn.execute("DELETE FROM scores WHERE expires_at <= ?", (self._last_compaction,))
+            self._conn.commit()
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self._index = {k: v for k, v in self._index.items() if v['expires_at'] > self._last_compaction}
+
+    def import_legacy_json(self, json_path: Path) -> None:
+        """Importa los scores del antiguo scores.json si la base todavía está vacía"""
+        if not json_path.exists():
+            return
+        if self._index:
+            return
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            saved_time = datetime.fromisoformat(data['timestamp']) if 'timestamp' in data else datetime.now()
+            if datetime.now() - saved_time > timedelta(seconds=SCORES_TTL_SECONDS):
+                return
+            self.upsert(data.get('players', {}).values())
+            print(f"Importados {len(data.get('players', {}))} scores desde {json_path.name}")
+        except Exception as e:
+            print(f"Error importando scores antiguos: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+score_store = ScoreStore(SCORES_DB_FILE)
+score_store.import_legacy_json(SCORES_FILE)
+
+# Máxima demora (segundos) entre un cambio de score y su escritura en disco
+SCORES_FLUSH_INTERVAL = float(os.getenv("SCORES_FLUSH_INTERVAL", "2.0"))
+
+
+class ScoreWriter:
+    """Persistencia diferida: agrupa los jugadores modificados y los escribe desde un thread"""
+    def __init__(self, store: ScoreStore) -> None:
+        self.store = store
+        self._pending: Dict[str, Dict] = {}  # name_key -> {'id', 'name', 'score'}
+        self._dirty_since: Optional[float] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        # Se cierra junto con su sala; después de eso los cambios se descartan
+        self.closed = False
+        self.stats = {
+            "flushes": 0,
+            "records_written": 0,
+            "flush_errors": 0,
+            "dropped_after_close": 0,
+            "last_flush_lag": 0.0,
+            "max_flush_lag": 0.0,
+        }
 
-def load_scores() -> Dict[str, Dict]:
-    """Carga los scores guardados del archivo JSON"""
-    if not SCORES_FILE.exists():
-        return {}
-    
-    try:
-        with open(SCORES_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        # Verificar si los datos son antiguos (más de 1 día)
-        if 'timestamp' in data:
-            saved_time = datetime.fromisoformat(data['timestamp'])
-            if datetime.now() - saved_time > timedelta(days=1):
-                # Los datos son antiguos, limpiar
-                return {}
-        
-        return data.get('players', {})
-    except Exception as e:
-        print(f"Error cargando scores: {e}")
-        return {}
+    def mark_dirty(self, player: Player) -> None:
+        """Registra el score actual de un jugador para escribirlo en el próximo flush (no bloquea)"""
+        if self.closed:
+            # Un socket que todavía apunta a una sala cerrada: el almacén ya no existe
+            print(f"Score de {player.name} descartado: la sala ya fue cerrada")
+            self.stats["dropped_after_close"] += 1
+            return
+        self._pending[normalize_player_name(player.name)] = {'id': player.id, 'name': player.name, 'score': player.score}
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    def lookup(self, name: str) -> Optional[Dict]:
+        """Busca un jugador considerando también los cambios todavía no escritos"""
+        pending = self._pending.get(normalize_player_name(name))
+        if pending:
+            return dict(pending)
+        return self.store.get(name)
+
+    async def _flush_later(self) -> None:
+        while not self.closed:
+            await asyncio.sleep(SCORES_FLUSH_INTERVAL)
+            if self.closed:
+                return
+            await self.flush()
+            if not self._pending:
+                return
 
-def save_scores(players: Dict[str, Player]) -> None:
-    """Guarda los scores en el archivo JSON, manteniendo los scores históricos"""
-    try:
-        # Cargar scores existentes para mantener los históricos
-        existing_scores = load_scores()
-        
-        # Actualizar o agregar los scores de los jugadores actuales
-        for player_id, player in players.items():
-            # Buscar si existe un jugador con el mismo nombre en los scores guardados
-            # (puede tener un ID diferente si se reconectó)
-            found_by_name = False
-            for saved_id, saved_data in existing_scores.items():
-                if saved_data['name'].strip().lower() == player.name.strip().lower():
-                    # Actualizar el score del jugador existente (mantener el ID original)
-                    existing_scores[saved_id] = {
-                        'id': saved_id,  # Mantener el ID original
-                        'name': player.name,
-                        'score': player.score
-                    }
-                    found_by_name = True
-                    break
-            
-            # Si no se encontró por nombre, agregar nuevo jugador
-            if not found_by_name:
-                existing_scores[player_id] = {
-                    'id': player.id,
-                    'name': player.name,
-                    'score': player.score
-                }
-        
-        data = {
-            'timestamp': datetime.now().isoformat(),
-            'players': existing_scores
+    async def flush(self) -> None:
+        """Escribe en disco todos los cambios pendientes"""
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch = self._pending
+            dirty_since = self._dirty_since
+            self._pending = {}
+            self._dirty_since = None
+            try:
+                await asyncio.to_thread(self.store.upsert, list(batch.values()))
+            except Exception as e:
+                print(f"Error guardando scores: {e}")
+                self.stats["flush_errors"] += 1
+                # Reintentar en el próximo flush sin pisar cambios más nuevos
+                for key, record in batch.items():
+                    self._pending.setdefault(key, record)
+                if self._dirty_since is None:
+                    self._dirty_since = dirty_since
+                return
+            lag = time.monotonic() - dirty_since if dirty_since else 0.0
+            self.stats["flushes"] += 1
+            self.stats["records_written"] += len(batch)
+            self.stats["last_flush_lag"] = round(lag, 3)
+            self.stats["max_flush_lag"] = round(max(self.stats["max_flush_lag"], lag), 3)
+
+    async def close(self) -> None:
+        """Escribe lo pendiente y cierra el almacén (al cerrar una sala)"""
+        self.closed = True
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
+        self._pending = {}
+        await asyncio.to_thread(self.store.close)
+
+    def get_metrics(self) -> Dict:
+        return {**self.stats, "pending": len(self._pending), "flush_interval": SCORES_FLUSH_INTERVAL}
+
+
+score_writer = ScoreWriter(score_store)
+
+
+def room_scores_path(room_name: str) -> Path:
+    """Archivo de scores de una sala (nombre legible + hash para evitar colisiones)"""
+    slug = re.sub(r'[^a-z0-9_-]+', '_', room_name)[:40]
+    digest = hashlib.sha1(room_name.encode('utf-8')).hexdigest()[:10]
+    return SCORES_DIR / f"{slug}-{digest}.db"
+
+
+def open_room_scores(room_name: str) -> ScoreWriter:
+    """Abre (o crea) el almacén de scores de una sala; hace I/O, llamar desde un thread"""
+    SCORES_DIR.mkdir(parents=True, exist_ok=True)
+    return ScoreWriter(ScoreStore(room_scores_path(room_name)))
+
+
+class InstrumentedLock:
+    """asyncio.Lock que mide cuánto esperan las tareas para tomarlo"""
+    def __init__(self) -> None:
+        self._lock = asyncio.Lock()
+        self.stats = {"acquisitions": 0, "contended": 0, "total_wait": 0.0, "max_wait": 0.0}
+
+    async def __aenter__(self) -> None:
+        if not self._lock.locked():
+            await self._lock.acquire()
+            self.stats["acquisitions"] += 1
+            return
+        start = time.perf_counter()
+        await self._lock.acquire()
+        wait = time.perf_counter() - start
+        self.stats["acquisitions"] += 1
+        self.stats["contended"] += 1
+        self.stats["total_wait"] += wait
+        self.stats["max_wait"] = max(self.stats["max_wait"], wait)
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self._lock.release()
+
+    def locked(self) -> bool:
+        return self._lock.locked()
+
+    def get_metrics(self) -> Dict:
+        return {
+            **self.stats,
+            "total_wait": round(self.stats["total_wait"], 4),
+            "max_wait": round(self.stats["max_wait"], 4),
         }
-        
-        with open(SCORES_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error guardando scores: {e}")
+
+
+def build_events_message(events: List[Dict]) -> Dict:
+    """Agrupa todas las consecuencias de un cambio en un único frame 'events'"""
+    if len(events) == 1:
+        return events[0]
+    return {"type": "events", "payload": {"events": events}}
+
+
+# Cantidad de patches recientes que guarda cada sala para clientes que se atrasan
+ROOM_PATCH_LOG_SIZE = int(os.getenv("ROOM_PATCH_LOG_SIZE", "200"))
+# Cantidad de temas siguientes en track_order cuyo audio se precarga al cambiar de ronda
+AUDIO_PREFETCH_AHEAD = int(os.getenv("AUDIO_PREFETCH_AHEAD", "2"))
+
 
 class Room:
-    def __init__(self, tracks: List[Track]) -> None:
+    def __init__(self, tracks: List[Track], scores: Optional[ScoreWriter] = None) -> None:
         self.tracks = tracks
+        # Scores de esta sala (cada sala escribe en su propio almacén)
+        self.scores = scores or score_writer
+        # Identificador de esta instancia: los tickets de una sala cerrada no sirven para otra con el mismo nombre
+        self.id = uuid.uuid4().hex
+        # player_id -> momento a partir del cual se revocaron sus tickets (ban)
+        self.ticket_revocations: Dict[str, float] = {}
         self.track_order: List[str] = []
         self.current_track_id: Optional[str] = None
         self.status: str = "stopped"
         self.players: Dict[str, Player] = {}
+        # Índice nombre normalizado -> player_id, se mantiene junto con self.players
+        self._name_index: Dict[str, str] = {}
         self.buzz_queue: List[str] = []
-        self._lock = asyncio.Lock()
+        # Versión del estado: se incrementa con cada cambio y viaja en cada patch
+        self.version: int = 0
+        self._patches: deque = deque(maxlen=ROOM_PATCH_LOG_SIZE)
+        self._lock = InstrumentedLock()
+        self._prefetch_task: Optional[asyncio.Task] = None
         self.reset_queue()
         # Cargar scores guardados
         self._load_persisted_scores()
     
     def _load_persisted_scores(self) -> None:
         """Carga los scores persistidos al inicializar (solo para referencia, no los carga como activos)"""
-        persisted_scores = load_scores()
-        if persisted_scores:
-            print(f"Hay {len(persisted_scores)} jugadores con scores guardados (se cargarán cuando se conecten)")
+        persisted_count = self.scores.store.count()
+        if persisted_count:
+            print(f"Hay {persisted_count} jugadores con scores guardados (se cargarán cuando se conecten)")
+
+    def _commit(self, ops: List[Dict]) -> Dict:
+        """Registra un cambio de estado y retorna su patch (llamar con el lock tomado)"""
+        self.version += 1
+        patch = {"type": "patch", "payload": {"version": self.version, "ops": ops}}
+        self._patches.append(patch)
+        return patch
+
+    def patches_since(self, version: int) -> Optional[List[Dict]]:
+        """Patches posteriores a `version`, o None si el cliente necesita un snapshot completo"""
+        if version > self.version:
+            return None
+        missing = self.version - version
+        if missing > len(self._patches):
+            return None
+        return list(self._patches)[len(self._patches) - missing:]
+
+    def _current_track_info(self) -> Dict:
+        """Título y artista de la canción actual (llamar con el lock tomado)"""
+        current_track = next((t for t in self.tracks if t.id == self.current_track_id), None)
+        if not current_track:
+            return {}
+        # Parsear título y artista
+        parts = current_track.title.split(' - ', 1)
+        return {
+            "title": parts[0] if parts else current_track.title,
+            "artist": parts[1] if len(parts) > 1 else "Artista desconocido"
+        }
+
+    def _point_awarded(self, player: Player, points: int) -> Dict:
+        return {
+            "type": "point_awarded",
+            "payload": {"playerId": player.id, "playerName": player.name, "points": points, "track": self._current_track_info()}
+        }
 
     def reset_queue(self) -> None:
         self.track_order = [t.id for t in self.tracks]
@@ -291,8 +564,28 @@ class Room:
         self.status = "stopped"
         self.buzz_queue = []
 
+    def _prefetch_upcoming(self) -> None:
+        """Precarga en segundo plano el audio del tema actual y los próximos de track_order (llamar con el lock tomado)"""
+        self.stop_prefetch()
+        if self.current_track_id not in self.track_order:
+            return
+        idx = self.track_order.index(self.current_track_id)
+        count = min(AUDIO_PREFETCH_AHEAD + 1, len(self.track_order))
+        upcoming = [self.track_order[(idx + i) % len(self.track_order)] for i in range(count)]
+        tracks_by_id = {t.id: t for t in self.tracks}
+        video_ids = [tracks_by_id[tid].video_id for tid in upcoming if tid in tracks_by_id and tracks_by_id[tid].video_id]
+        if video_ids:
+            self._prefetch_task = asyncio.create_task(audio_prefetcher.warm_all(video_ids))
+
+    def stop_prefetch(self) -> None:
+        """Cancela la precarga pendiente (el orden cambió o la sala se cerró)"""
+        if self._prefetch_task:
+            self._prefetch_task.cancel()
+            self._prefetch_task = None
+
     def to_state(self) -> GameState:
         return GameState(
+            version=self.version,
             tracks=self.tracks,
             track_order=self.track_order,
             current_track_id=self.current_track_id,
@@ -301,38 +594,32 @@ class Room:
             players=self.players,
         )
 
-    async def add_player(self, name: str, active_player_ids: set) -> tuple[Optional[Player], bool]:
+    async def add_player(self, name: str, active_player_ids: set) -> tuple[Optional[Player], bool, Optional[Dict]]:
         """
         Agrega un jugador o reutiliza uno existente.
-        Retorna (player, is_reused) donde:
+        Retorna (player, is_reused, patch) donde:
         - player es None si el nombre está en uso por una conexión activa
         - is_reused es True si se reutilizó un jugador existente
+        - patch es el cambio de estado a difundir en la sala
         """
         async with self._lock:
-            name_lower = name.strip().lower()
+            name_key = normalize_player_name(name)
             name_clean = name.strip()
             
             # Buscar si existe un jugador con ese nombre en jugadores activos
-            existing_player = None
-            for player in self.players.values():
-                if player.name.strip().lower() == name_lower:
-                    existing_player = player
-                    break
+            existing_id = self._name_index.get(name_key)
+            existing_player = self.players.get(existing_id) if existing_id else None
             
             if existing_player:
                 # Si el jugador existe y está conectado, rechazar
                 if existing_player.id in active_player_ids:
-                    return (None, False)  # Nombre en uso por conexión activa
+                    return (None, False, None)  # Nombre en uso por conexión activa
                 # Si existe pero no está conectado, reutilizar manteniendo el score
-                return (existing_player, True)
+                patch = self._commit([{"op": "player_added", "player": existing_player.model_dump(), "rejoin": True}])
+                return (existing_player, True, patch)
             
-            # Buscar en scores persistidos por nombre
-            persisted_scores = load_scores()
-            persisted_player = None
-            for saved_id, saved_data in persisted_scores.items():
-                if saved_data['name'].strip().lower() == name_lower:
-                    persisted_player = saved_data
-                    break
+            # Buscar en scores persistidos por nombre (índice en memoria)
+            persisted_player = self.scores.lookup(name_clean)
             
             # Crear nuevo jugador o recuperar de persistencia
             if persisted_player:
@@ -343,203 +630,385 @@ class Room:
                     score=persisted_player['score']
                 )
                 self.players[persisted_player['id']] = player
-                # Actualizar timestamp en persistencia
-                save_scores(self.players)
-                return (player, True)  # Es una reconexión
+                self._name_index[name_key] = player.id
+                # Renovar el vencimiento en persistencia
+                self.scores.mark_dirty(player)
+                patch = self._commit([{"op": "player_added", "player": player.model_dump(), "rejoin": True}])
+                return (player, True, patch)  # Es una reconexión
             else:
                 # Crear nuevo jugador
                 player_id = str(uuid.uuid4())
                 player = Player(id=player_id, name=name_clean, score=0)
                 self.players[player_id] = player
-                # Guardar scores después de agregar jugador
-                save_scores(self.players)
-                return (player, False)
+                self._name_index[name_key] = player_id
+                # Guardar score después de agregar jugador
+                self.scores.mark_dirty(player)
+                patch = self._commit([{"op": "player_added", "player": player.model_dump(), "rejoin": False}])
+                return (player, False, patch)
 
-    async def remove_player(self, player_id: str) -> None:
+    async def remove_player(self, player_id: str) -> Optional[Dict]:
         async with self._lock:
             # Guardar el score antes de remover (para mantenerlo en persistencia)
             player = self.players.get(player_id)
-            if player:
-                # Guardar el score antes de remover del diccionario activo
-                save_scores(self.players)
+            if not player:
+                return None
+            # Guardar el score antes de remover del diccionario activo
+            self.scores.mark_dirty(player)
             # Remover del diccionario activo (pero el score ya está guardado)
             self.players.pop(player_id, None)
+            self._name_index.pop(normalize_player_name(player.name), None)
             self.buzz_queue = [pid for pid in self.buzz_queue if pid != player_id]
-            # No guardar después de remover, ya se guardó antes
+            return self._commit([{"op": "player_removed", "playerId": player_id}])
 
-    async def record_buzz(self, player_id: str) -> bool:
+    async def record_buzz(self, player_id: str) -> Optional[Dict]:
         async with self._lock:
             if player_id not in self.players:
-                return False
+                return None
             if player_id in self.buzz_queue:
-                return False
+                return None
             first_buzz = len(self.buzz_queue) == 0
             self.buzz_queue.append(player_id)
             if first_buzz:
                 self.status = "paused"
-            return True
+            return self._commit([
+                {"op": "buzz_queue", "queue": list(self.buzz_queue)},
+                {"op": "status", "status": self.status},
+            ])
 
-    async def set_winner(self, player_id: str) -> Optional[Player]:
+    async def set_winner(self, player_id: str) -> tuple[Optional[Player], Optional[Dict]]:
+        """Suma un punto al ganador; retorna (player, frame con el patch y el aviso de punto)"""
         async with self._lock:
             player = self.players.get(player_id)
             if not player:
-                return None
+                return (None, None)
             player.score += 1
             self.buzz_queue = []
             self.status = "stopped"
-            # Guardar scores después de cambiar
-            save_scores(self.players)
-            return player
+            # Guardar score después de cambiar
+            self.scores.mark_dirty(player)
+            patch = self._commit([
+                {"op": "score", "playerId": player.id, "score": player.score},
+                {"op": "buzz_queue", "queue": []},
+                {"op": "status", "status": self.status},
+            ])
+            return (player, build_events_message([patch, self._point_awarded(player, 1)]))
     
-    async def adjust_score(self, player_id: str, points: int) -> Optional[Player]:
-        """Ajusta la puntuación de un jugador (puede ser positivo o negativo)"""
+    async def adjust_score(self, player_id: str, points: int) -> tuple[Optional[Player], Optional[Dict]]:
+        """Ajusta la puntuación de un jugador (puede ser positivo o negativo); retorna (player, frame)"""
         async with self._lock:
             player = self.players.get(player_id)
             if not player:
-                return None
+                return (None, None)
             player.score = player.score + points  # Permitir puntuación negativa
-            # Guardar scores después de cambiar
-            save_scores(self.players)
-            return player
+            # Guardar score después de cambiar
+            self.scores.mark_dirty(player)
+            patch = self._commit([{"op": "score", "playerId": player.id, "score": player.score}])
+            return (player, build_events_message([patch, self._point_awarded(player, points)]))
 
-    async def set_status(self, status: str) -> None:
+    async def set_status(self, status: str) -> Dict:
         async with self._lock:
             self.status = status
+            ops = [{"op": "status", "status": status}]
             if status == "stopped":
                 self.buzz_queue = []
+                ops.append({"op": "buzz_queue", "queue": []})
+            return self._commit(ops)
 
-    async def next_track(self) -> None:
+    def _change_track(self, track_id: str) -> Dict:
+        self.current_track_id = track_id
+        self.status = "stopped"
+        self.buzz_queue = []
+        self._prefetch_upcoming()
+        return self._commit([
+            {"op": "current_track", "currentTrackId": track_id},
+            {"op": "status", "status": "stopped"},
+            {"op": "buzz_queue", "queue": []},
+        ])
+
+    async def next_track(self) -> Optional[Dict]:
         async with self._lock:
             if not self.track_order:
-                return
+                return None
             idx = self.track_order.index(self.current_track_id) if self.current_track_id in self.track_order else -1
             next_idx = (idx + 1) % len(self.track_order)
-            self.current_track_id = self.track_order[next_idx]
-            self.status = "stopped"
-            self.buzz_queue = []
+            return self._change_track(self.track_order[next_idx])
+
+    async def select_track(self, track_id: str) -> Optional[Dict]:
+        async with self._lock:
+            if not any(t.id == track_id for t in self.tracks):
+                return None
+            return self._change_track(track_id)
 
     async def update_tracks(self, new_tracks: List[Track]) -> None:
         async with self._lock:
             self.tracks = new_tracks
             self.reset_queue()
+            self._prefetch_upcoming()
+            # Cambió la lista completa: los clientes deben recibir un snapshot nuevo
+            self.version += 1
+            self._patches.clear()
+
+
+# Hilos dedicados a bcrypt: hashear o verificar cuesta ~250 ms de CPU y no debe correr en el event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+password_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+password_stats = {"pending": 0, "max_pending": 0, "completed": 0}
+
+
+async def _run_password_task(func, *args):
+    password_stats["pending"] += 1
+    password_stats["max_pending"] = max(password_stats["max_pending"], password_stats["pending"])
+    try:
+        return await asyncio.get_running_loop().run_in_executor(password_executor, func, *args)
+    finally:
+        password_stats["pending"] -= 1
+        password_stats["completed"] += 1
+
+
+def _hash_password_sync(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+
+def _check_password_sync(password: str, password_hash: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+    except ValueError:
+        return False
+
+
+async def hash_password(password: str) -> str:
+    """Hashea una contraseña con bcrypt en el pool de hilos"""
+    return await _run_password_task(_hash_password_sync, password)
+
+
+async def check_password(password: str, password_hash: str) -> bool:
+    """Verifica una contraseña contra su hash bcrypt en el pool de hilos"""
+    return await _run_password_task(_check_password_sync, password, password_hash)
+
+
+# Secreto para firmar tickets de sesión (si no se configura se genera uno por proceso,
+# y los tickets emitidos dejan de valer al reiniciar el servidor)
+SESSION_SECRET = os.getenv("SESSION_SECRET", "") or secrets.token_hex(32)
+# Validez de un ticket de sala (segundos)
+ROOM_TICKET_TTL = int(os.getenv("ROOM_TICKET_TTL", str(6 * 60 * 60)))
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+def sign_token(payload: Dict) -> str:
+    """Firma un payload con HMAC-SHA256 (formato: payload_base64.firma_base64)"""
+    body = _b64encode(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+    signature = hmac.new(SESSION_SECRET.encode('utf-8'), body.encode('ascii'), hashlib.sha256).digest()
+    return f"{body}.{_b64encode(signature)}"
+
+
+def verify_token(token: str, kind: str) -> Optional[Dict]:
+    """Retorna el payload de un token firmado si la firma es válida, es del tipo indicado y no venció"""
+    try:
+        body, signature = token.split('.', 1)
+        expected = hmac.new(SESSION_SECRET.encode('utf-8'), body.encode('ascii'), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            return None
+        payload = json.loads(_b64decode(body))
+    except (ValueError, TypeError, UnicodeError):
+        return None
+    if not isinstance(payload, dict) or payload.get('kind') != kind or payload.get('exp', 0) < time.time():
+        return None
+    return payload
 
 
 class RoomManager:
-    """Gestiona múltiples salas de juego"""
+    """
+    Gestiona múltiples salas de juego.
+    `self.rooms` nunca se modifica en el lugar: crear y cerrar reemplazan el diccionario completo
+    (copy-on-write) bajo el lock, así las lecturas no necesitan tomarlo.
+    """
     def __init__(self):
         self.rooms: Dict[str, Dict] = {}  # room_name -> {password_hash, room_instance, created_at}
-        self._lock = asyncio.Lock()
+        self._lock = InstrumentedLock()
     
     async def create_room(self, room_name: str, password: str) -> bool:
         """Crea una nueva sala con contraseña hasheada"""
+        room_name_clean = room_name.strip().lower()
+        if room_name_clean in self.rooms:
+            return False  # Sala ya existe
+        
+        # Hash de la contraseña y apertura del almacén de scores fuera del lock global
+        password_hash = await hash_password(password)
+        scores = await asyncio.to_thread(open_room_scores, room_name_clean)
+        
         async with self._lock:
-            room_name_clean = room_name.strip().lower()
-            if room_name_clean in self.rooms:
-                return False  # Sala ya existe
-            
-            # Hash de la contraseña
-            password_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-            
-            # Crear nueva instancia de Room para esta sala
-            new_room = Room(TRACKS.copy())
-            
-            self.rooms[room_name_clean] = {
-                'password_hash': password_hash,
-                'room': new_room,
-                'created_at': datetime.now()
-            }
-            return True
+            # Otra petición pudo crear la sala mientras se hasheaba
+            created = room_name_clean not in self.rooms
+            if created:
+                self.rooms = {**self.rooms, room_name_clean: {
+                    'password_hash': password_hash,
+                    'room': Room(TRACKS.copy(), scores),
+                    'created_at': datetime.now()
+                }}
+        if not created:
+            await scores.close()
+        return created
     
     async def join_room(self, room_name: str, password: str) -> Optional[Room]:
         """Valida la contraseña y retorna la instancia de Room si es correcta"""
-        async with self._lock:
-            room_name_clean = room_name.strip().lower()
-            if room_name_clean not in self.rooms:
-                return None  # Sala no existe
-            
-            room_data = self.rooms[room_name_clean]
-            password_hash = room_data['password_hash']
-            
-            # Verificar contraseña
-            if bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8')):
-                return room_data['room']
+        room_data = self.rooms.get(room_name.strip().lower())
+        if not room_data:
+            return None  # Sala no existe
+        
+        # Verificar contraseña fuera del lock global (bcrypt corre en el pool de hilos)
+        if await check_password(password, room_data['password_hash']):
+            return room_data['room']
+        return None
+    
+    def issue_ticket(self, room_name: str, role: str, player: Optional[Player] = None) -> Optional[str]:
+        """Emite un ticket firmado que permite reconectarse a la sala sin volver a verificar la contraseña"""
+        room_data = self.rooms.get(room_name.strip().lower())
+        if not room_data:
+            return None
+        now = time.time()
+        return sign_token({
+            'kind': 'room',
+            'room': room_name.strip().lower(),
+            'rid': room_data['room'].id,
+            'role': role,
+            'pid': player.id if player else None,
+            'name': player.name if player else None,
+            'iat': now,
+            'exp': now + ROOM_TICKET_TTL,
+        })
+
+    def redeem_ticket(self, room_name: str, ticket: str, role: str) -> Optional[tuple[Room, Dict]]:
+        """Valida un ticket de sala; retorna (room, payload) o None si es inválido, venció o fue revocado"""
+        payload = verify_token(ticket, 'room')
+        if not payload or payload.get('room') != room_name.strip().lower() or payload.get('role') != role:
             return None
+        room_data = self.rooms.get(payload['room'])
+        if not room_data or room_data['room'].id != payload.get('rid'):
+            return None  # La sala se cerró (o se recreó)
+        room_instance = room_data['room']
+        revoked_at = room_instance.ticket_revocations.get(payload.get('pid') or '')
+        if revoked_at is not None and payload.get('iat', 0) <= revoked_at:
+            return None
+        return room_instance, payload
     
     async def room_exists(self, room_name: str) -> bool:
         """Verifica si una sala existe"""
-        async with self._lock:
-            room_name_clean = room_name.strip().lower()
-            return room_name_clean in self.rooms
+        return room_name.strip().lower() in self.rooms
     
     async def get_room(self, room_name: str) -> Optional[Room]:
         """Obtiene la instancia de Room sin validar contraseña (para uso interno)"""
-        async with self._lock:
-            room_name_clean = room_name.strip().lower()
-            if room_name_clean in self.rooms:
-                return self.rooms[room_name_clean]['room']
-            return None
+        room_data = self.rooms.get(room_name.strip().lower())
+        return room_data['room'] if room_data else None
     
     async def list_rooms(self) -> List[Dict]:
         """Lista todas las salas activas con información"""
-        async with self._lock:
-            rooms_info = []
-            for room_name, room_data in self.rooms.items():
-                room_instance = room_data['room']
-                created_at = room_data.get('created_at', datetime.now())
-                rooms_info.append({
-                    'name': room_name,
-                    'created_at': created_at.isoformat(),
-                    'player_count': len(room_instance.players),
-                    'track_count': len(room_instance.tracks),
-                    'current_track_id': room_instance.current_track_id,
-                    'status': room_instance.status
-                })
-            return rooms_info
+        rooms_info = []
+        for room_name, room_data in self.rooms.items():
+            room_instance = room_data['room']
+            created_at = room_data.get('created_at', datetime.now())
+            rooms_info.append({
+                'name': room_name,
+                'created_at': created_at.isoformat(),
+                'player_count': len(room_instance.players),
+                'track_count': len(room_instance.tracks),
+                'current_track_id': room_instance.current_track_id,
+                'status': room_instance.status
+            })
+        return rooms_info
     
     async def close_room(self, room_name: str) -> bool:
         """Cierra y elimina una sala"""
         async with self._lock:
-            room_name_clean = room_name.strip().lower()
-            if room_name_clean in self.rooms:
-                del self.rooms[room_name_clean]
-                return True
+            rooms = dict(self.rooms)
+            room_data = rooms.pop(room_name.strip().lower(), None)
+            self.rooms = rooms
+        if not room_data:
             return False
+        room_data['room'].stop_prefetch()
+        # Guardar los scores pendientes de la sala y liberar su almacén
+        await room_data['room'].scores.close()
+        return True
     
     async def get_room_info(self, room_name: str) -> Optional[Dict]:
         """Obtiene información detallada de una sala"""
-        async with self._lock:
-            room_name_clean = room_name.strip().lower()
-            if room_name_clean not in self.rooms:
-                return None
-            
-            room_instance = self.rooms[room_name_clean]['room']
-            room_data = self.rooms[room_name_clean]
-            
-            return {
-                'name': room_name_clean,
-                'created_at': room_data.get('created_at', datetime.now()).isoformat(),
-                'players': {pid: p.model_dump() for pid, p in room_instance.players.items()},
-                'player_count': len(room_instance.players),
-                'tracks': [t.model_dump() for t in room_instance.tracks],
-                'track_count': len(room_instance.tracks),
-                'current_track_id': room_instance.current_track_id,
-                'status': room_instance.status,
-                'buzz_queue': room_instance.buzz_queue
-            }
+        room_name_clean = room_name.strip().lower()
+        room_data = self.rooms.get(room_name_clean)
+        if not room_data:
+            return None
+        
+        room_instance = room_data['room']
+        
+        return {
+            'name': room_name_clean,
+            'created_at': room_data.get('created_at', datetime.now()).isoformat(),
+            'players': {pid: p.model_dump() for pid, p in room_instance.players.items()},
+            'player_count': len(room_instance.players),
+            'tracks': [t.model_dump() for t in room_instance.tracks],
+            'track_count': len(room_instance.tracks),
+            'current_track_id': room_instance.current_track_id,
+            'status': room_instance.status,
+            'buzz_queue': room_instance.buzz_queue
+        }
 
 
 room_manager = RoomManager()
 room = Room(TRACKS)  # Mantener para compatibilidad temporal
 
 
+def encode_message(message: Dict) -> str:
+    """Serializa un mensaje de WebSocket una sola vez (usa orjson si está instalado)"""
+    if orjson is not None:
+        return orjson.dumps(message).decode('utf-8')
+    return json.dumps(message, ensure_ascii=False, separators=(',', ':'))
+
+
+# Tamaño máximo de la cola de salida de cada WebSocket antes de considerarlo lento
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+
+
 class ConnectionManager:
     def __init__(self) -> None:
         self.active: Dict[WebSocket, Dict[str, Optional[str]]] = {}
         self.rooms: Dict[str, List[WebSocket]] = {}  # room_name -> [websockets]
+        # Cada conexión tiene su propia cola de salida y una tarea que la vacía,
+        # así un cliente lento no retrasa los mensajes del resto de la sala
+        self.queues: Dict[WebSocket, asyncio.Queue] = {}
+        self.writers: Dict[WebSocket, asyncio.Task] = {}
+        self.degraded: set = set()
+        self.stats = {
+            "messages_enqueued": 0,
+            "messages_sent": 0,
+            "messages_dropped": 0,
+            "slow_consumers_dropped": 0,
+            "send_errors": 0,
+        }
 
     async def connect(self, websocket: WebSocket) -> None:
         await websocket.accept()
         self.active[websocket] = {"player_id": None, "role": None, "room_name": None}
+        queue: asyncio.Queue = asyncio.Queue(maxsize=WS_SEND_QUEUE_SIZE)
+        self.queues[websocket] = queue
+        self.writers[websocket] = asyncio.create_task(self._writer(websocket, queue))
+
+    async def _writer(self, websocket: WebSocket, queue: asyncio.Queue) -> None:
+        """Envía en orden los mensajes encolados para una conexión"""
+        while True:
+            message = await queue.get()
+            try:
+                await websocket.send_text(message)
+                self.stats["messages_sent"] += 1
+            except Exception:
+                # La conexión está rota; el endpoint la saca de la sala al terminar su loop de recepción
+                self.stats["send_errors"] += 1
+                self.degraded.add(websocket)
+                return
 
     def set_identity(self, websocket: WebSocket, player_id: Optional[str], role: Optional[str], room_name: Optional[str] = None) -> None:
         if websocket in self.active:
@@ -555,6 +1024,11 @@ class ConnectionManager:
 
     def disconnect(self, websocket: WebSocket) -> Optional[str]:
         info = self.active.pop(websocket, None)
+        self.queues.pop(websocket, None)
+        self.degraded.discard(websocket)
+        writer = self.writers.pop(websocket, None)
+        if writer and writer is not asyncio.current_task():
+            writer.cancel()
         room_name = info.get("room_name") if info else None
         if room_name and room_name in self.rooms:
             self.rooms[room_name] = [ws for ws in self.rooms[room_name] if ws != websocket]
@@ -569,21 +1043,67 @@ class ConnectionManager:
             return {self.active[ws]["player_id"] for ws in room_websockets if self.active.get(ws, {}).get("player_id")}
         return {info["player_id"] for info in self.active.values() if info.get("player_id")}
 
-    async def broadcast(self, message: Dict, room_name: Optional[str] = None) -> None:
+    def send(self, websocket: WebSocket, message: Union[Dict, str]) -> bool:
+        """Encola un mensaje (dict o ya serializado) para una conexión sin esperar a que se envíe"""
+        queue = self.queues.get(websocket)
+        if queue is None or websocket in self.degraded:
+            return False
+        if not isinstance(message, str):
+            message = encode_message(message)
+        try:
+            queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # Cliente demasiado lento: descartarlo en vez de frenar a los demás
+            self.stats["messages_dropped"] += 1
+            self._drop_slow_consumer(websocket)
+            return False
+        self.stats["messages_enqueued"] += 1
+        return True
+
+    def _drop_slow_consumer(self, websocket: WebSocket) -> None:
+        self.degraded.add(websocket)
+        self.stats["slow_consumers_dropped"] += 1
+        writer = self.writers.get(websocket)
+        if writer:
+            writer.cancel()
+        info = self.active.get(websocket, {})
+        print(f"⚠ Conexión lenta descartada (sala: {info.get('room_name')}, jugador: {info.get('player_id')})")
+        # Cerrar el socket hace que su loop de recepción limpie jugador y sala
+        asyncio.create_task(self._close_quietly(websocket))
+
+    @staticmethod
+    async def _close_quietly(websocket: WebSocket) -> None:
+        try:
+            await websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def broadcast(self, message: Union[Dict, str], room_name: Optional[str] = None) -> None:
         """Broadcast a todos los clientes o solo a los de una sala específica"""
         if room_name:
-            targets = self.rooms.get(room_name, [])
+            targets = list(self.rooms.get(room_name, []))
         else:
             targets = list(self.active.keys())
+        if not targets:
+            return
         
-        dead = []
+        # Serializar una sola vez y enviar el mismo frame a todos
+        if not isinstance(message, str):
+            message = encode_message(message)
         for ws in targets:
-            try:
-                await ws.send_json(message)
-            except Exception:
-                dead.append(ws)
-        for ws in dead:
-            self.disconnect(ws)
+            self.send(ws, message)
+
+    def get_metrics(self) -> Dict:
+        """Métricas de las colas de salida"""
+        depths = [q.qsize() for q in self.queues.values()]
+        return {
+            **self.stats,
+            "connections": len(self.active),
+            "degraded_connections": len(self.degraded),
+            "queue_depth_total": sum(depths),
+            "queue_depth_max": max(depths, default=0),
+            "queue_capacity": WS_SEND_QUEUE_SIZE,
+        }
 
 
 manager = ConnectionManager()
@@ -626,15 +1146,23 @@ async def websocket_endpoint(websocket: WebSocket):
                     
                     # Validar sala y contraseña
                     if not room_name_param:
-                        await websocket.send_json({
+                        manager.send(websocket, {
                             "type": "join_error",
                             "payload": {"message": "Nombre de sala requerido"}
                         })
                         continue
                     
-                    room_instance = await room_manager.join_room(room_name_param, password)
+                    # Un ticket válido (emitido en un join anterior) evita verificar la contraseña con bcrypt
+                    ticket = data.get("ticket")
+                    redeemed = room_manager.redeem_ticket(room_name_param, ticket, role) if ticket else None
+                    if redeemed:
+                        room_instance, ticket_data = redeemed
+                        if ticket_data.get("name"):
+                            name = ticket_data["name"]
+                    else:
+                        room_instance = await room_manager.join_room(room_name_param, password)
                     if not room_instance:
-                        await websocket.send_json({
+                        manager.send(websocket, {
                             "type": "join_error",
                             "payload": {"message": "Nombre de sala o contraseña incorrectos"}
                         })
@@ -646,32 +1174,36 @@ async def websocket_endpoint(websocket: WebSocket):
                     
                     if role == "player":
                         active_ids = manager.get_active_player_ids(room_name)
-                        player, is_reused = await current_room.add_player(name, active_ids)
+                        player, is_reused, patch = await current_room.add_player(name, active_ids)
                         if player is None:
                             # Nombre en uso por conexión activa
-                            await websocket.send_json({
+                            manager.send(websocket, {
                                 "type": "join_error",
                                 "payload": {"message": "Este nombre ya está en uso por un jugador conectado. Por favor elige otro nombre."}
                             })
                         else:
                             manager.set_identity(websocket, player.id, role, room_name)
-                            if is_reused:
-                                # Si se reutilizó, notificar que el jugador volvió
-                                await manager.broadcast({"type": "player_rejoin", "payload": player.model_dump()}, room_name)
-                            else:
-                                # Si es nuevo, notificar normalmente
-                                await manager.broadcast({"type": "player_join", "payload": player.model_dump()}, room_name)
-                            await websocket.send_json({"type": "join_ack", "payload": {"playerId": player.id, "isReused": is_reused}})
-                            await websocket.send_json(build_state_message(current_room))
+                            # Notificar a la sala con un patch (el patch indica si es una reconexión)
+                            await manager.broadcast(patch, room_name)
+                            manager.send(websocket, build_events_message([
+                                {"type": "join_ack", "payload": {
+                                    "playerId": player.id,
+                                    "isReused": is_reused,
+                                    "ticket": room_manager.issue_ticket(room_name, role, player),
+                                }},
+                                build_state_message(current_room),
+                            ]))
                     else:
                         manager.set_identity(websocket, None, role, room_name)
-                        await websocket.send_json({"type": "join_ack", "payload": {"playerId": None}})
-                        await websocket.send_json(build_state_message(current_room))
+                        manager.send(websocket, build_events_message([
+                            {"type": "join_ack", "payload": {"playerId": None, "ticket": room_manager.issue_ticket(room_name, role)}},
+                            build_state_message(current_room),
+                        ]))
                 except Exception as e:
                     print(f"[ERROR] Error processing join message: {str(e)}")
                     import traceback
                     traceback.print_exc()
-                    await websocket.send_json({
+                    manager.send(websocket, {
                         "type": "join_error",
                         "payload": {"message": f"Error procesando la solicitud: {str(e)}"}
                     })
@@ -684,7 +1216,7 @@ async def websocket_endpoint(websocket: WebSocket):
                         room_name = room_name_from_ws
                 
                 if not current_room:
-                    await websocket.send_json({
+                    manager.send(websocket, {
                         "type": "error",
                         "payload": {"message": "Debes unirte a una sala primero"}
                     })
@@ -692,10 +1224,9 @@ async def websocket_endpoint(websocket: WebSocket):
                 
                 if msg_type == "buzz":
                     player_id = data.get("playerId")
-                    accepted = await current_room.record_buzz(player_id)
-                    if accepted:
-                        await manager.broadcast({"type": "buzzer", "payload": {"queue": current_room.buzz_queue}}, room_name)
-                        await manager.broadcast({"type": "control", "payload": {"status": current_room.status}}, room_name)
+                    patch = await current_room.record_buzz(player_id)
+                    if patch:
+                        await manager.broadcast(patch, room_name)
                 elif msg_type == "control":
                     action = data.get("action")
                     if action in {"play", "pause", "stop", "preview2", "preview5"}:
@@ -707,72 +1238,56 @@ async def websocket_endpoint(websocket: WebSocket):
                             "preview5": "preview5",
                         }
                         new_status = status_map[action]
-                        await current_room.set_status(new_status)
-                        await manager.broadcast({"type": "control", "payload": {"status": current_room.status}}, room_name)
+                        patch = await current_room.set_status(new_status)
+                        await manager.broadcast(patch, room_name)
                 elif msg_type == "set_winner":
                     player_id = data.get("playerId")
-                    winner = await current_room.set_winner(player_id)
+                    winner, events = await current_room.set_winner(player_id)
                     if winner:
-                        # Obtener información de la canción actual
-                        current_track = next((t for t in current_room.tracks if t.id == current_room.current_track_id), None)
-                        track_info = {}
-                        if current_track:
-                            # Parsear título y artista
-                            parts = current_track.title.split(' - ', 1)
-                            track_info = {
-                                "title": parts[0] if parts else current_track.title,
-                                "artist": parts[1] if len(parts) > 1 else "Artista desconocido"
-                            }
-                        await manager.broadcast({"type": "scores", "payload": {"players": {pid: p.model_dump() for pid, p in current_room.players.items()}}}, room_name)
-                        await manager.broadcast({"type": "buzzer", "payload": {"queue": current_room.buzz_queue}}, room_name)
-                        await manager.broadcast({"type": "control", "payload": {"status": current_room.status}}, room_name)
-                        await manager.broadcast({"type": "point_awarded", "payload": {"playerId": player_id, "playerName": winner.name, "points": 1, "track": track_info}}, room_name)
+                        # Puntajes, buzzer, estado y aviso de punto en un solo frame
+                        await manager.broadcast(events, room_name)
                 elif msg_type == "adjust_score":
                     player_id = data.get("playerId")
                     points = data.get("points", 0)
-                    adjusted_player = await current_room.adjust_score(player_id, points)
+                    adjusted_player, events = await current_room.adjust_score(player_id, points)
                     if adjusted_player:
-                        # Obtener información de la canción actual
-                        current_track = next((t for t in current_room.tracks if t.id == current_room.current_track_id), None)
-                        track_info = {}
-                        if current_track:
-                            # Parsear título y artista
-                            parts = current_track.title.split(' - ', 1)
-                            track_info = {
-                                "title": parts[0] if parts else current_track.title,
-                                "artist": parts[1] if len(parts) > 1 else "Artista desconocido"
-                            }
-                        await manager.broadcast({"type": "scores", "payload": {"players": {pid: p.model_dump() for pid, p in current_room.players.items()}}}, room_name)
-                        await manager.broadcast({"type": "point_awarded", "payload": {"playerId": player_id, "playerName": adjusted_player.name, "points": points, "track": track_info}}, room_name)
+                        await manager.broadcast(events, room_name)
                 elif msg_type == "next_track":
-                    await current_room.next_track()
-                    await manager.broadcast({"type": "track_changed", "payload": {"currentTrackId": current_room.current_track_id}}, room_name)
-                    await manager.broadcast({"type": "control", "payload": {"status": current_room.status}}, room_name)
+                    patch = await current_room.next_track()
+                    if patch:
+                        await manager.broadcast(patch, room_name)
                 elif msg_type == "select_track":
                     track_id = data.get("trackId")
                     if track_id:
-                        async with current_room._lock:
-                            track_exists = any(t.id == track_id for t in current_room.tracks)
-                            if track_exists:
-                                current_room.current_track_id = track_id
-                                current_room.status = "stopped"
-                                current_room.buzz_queue = []
-                        await manager.broadcast({"type": "track_changed", "payload": {"currentTrackId": current_room.current_track_id}}, room_name)
-                        await manager.broadcast({"type": "control", "payload": {"status": current_room.status}}, room_name)
+                        patch = await current_room.select_track(track_id)
+                        if patch:
+                            await manager.broadcast(patch, room_name)
                 elif msg_type == "remove_player":
                     player_id_to_remove = data.get("playerId")
                     if player_id_to_remove:
-                        await current_room.remove_player(player_id_to_remove)
-                        await manager.broadcast({"type": "player_leave", "payload": {"playerId": player_id_to_remove}}, room_name)
-                        await manager.broadcast(build_state_message(current_room), room_name)
+                        patch = await current_room.remove_player(player_id_to_remove)
+                        if patch:
+                            await manager.broadcast(patch, room_name)
+                elif msg_type == "sync":
+                    # El cliente perdió versiones: enviar los patches faltantes o un snapshot
+                    client_version = data.get("version")
+                    patches = current_room.patches_since(client_version) if isinstance(client_version, int) else None
+                    if patches is None:
+                        manager.send(websocket, build_state_message(current_room))
+                    else:
+                        for patch in patches:
+                            manager.send(websocket, patch)
     except WebSocketDisconnect:
+        pass
+    finally:
+        # Limpiar siempre: un frame inválido o un error al procesar un mensaje también terminan la conexión
         player_id = manager.disconnect(websocket)
         if player_id and room_name:
             room_instance = await room_manager.get_room(room_name)
             if room_instance:
-                await room_instance.remove_player(player_id)
-                await manager.broadcast({"type": "player_leave", "payload": {"playerId": player_id}}, room_name)
-                await manager.broadcast(build_state_message(room_instance), room_name)
+                patch = await room_instance.remove_player(player_id)
+                if patch:
+                    await manager.broadcast(patch, room_name)
 
 
 def get_youtube_cookies_path() -> Optional[str]:
@@ -790,80 +1305,246 @@ def get_youtube_cookies_path() -> Optional[str]:
     return None
 
 
-def search_youtube_audio_url(track_name: str, artist_name: str) -> Optional[str]:
-    """Busca una canción en YouTube y retorna la URL de audio"""
+# Búsquedas en YouTube durante la importación: pool acotado de hilos y límite de pedidos por segundo por host
+YOUTUBE_SEARCH_WORKERS = int(os.getenv("YOUTUBE_SEARCH_WORKERS", "4"))
+YOUTUBE_REQUESTS_PER_SECOND = float(os.getenv("YOUTUBE_REQUESTS_PER_SECOND", "2"))
+youtube_search_executor = ThreadPoolExecutor(max_workers=YOUTUBE_SEARCH_WORKERS, thread_name_prefix="ytsearch")
+
+
+class RateLimiter:
+    """Espacia las llamadas para no superar `rate` por segundo (seguro entre hilos)"""
+    def __init__(self, rate: float) -> None:
+        self.interval = 1 / rate if rate > 0 else 0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+host_rate_limiters: Dict[str, RateLimiter] = {}
+
+
+def host_rate_limiter(host: str) -> RateLimiter:
+    limiter = host_rate_limiters.get(host)
+    if limiter is None:
+        limiter = host_rate_limiters.setdefault(host, RateLimiter(YOUTUBE_REQUESTS_PER_SECOND))
+    return limiter
+
+
+# Cantidad de resultados que se comparan en cada búsqueda
+YOUTUBE_SEARCH_CANDIDATES = 5
+# Palabras que indican otra versión de la canción (se penalizan si no están en el título de Spotify)
+YOUTUBE_VERSION_WORDS = {'live', 'vivo', 'cover', 'karaoke', 'remix', 'instrumental', 'acoustic', 'acustico', 'sped', 'slowed', 'reverb', 'nightcore', '8d'}
+
+
+def _title_words(text: str) -> set:
+    """Palabras en minúscula y sin acentos de un título"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii').lower()
+    return set(re.findall(r'[a-z0-9]+', text))
+
+
+def score_youtube_candidate(entry: Dict, track_name: str, artist_name: str, duration_ms: Optional[int]) -> float:
+    """Qué tan probable es que un resultado de búsqueda sea la canción (mayor es mejor)"""
+    title_words = _title_words(entry.get('title', ''))
+    channel_words = _title_words(entry.get('channel') or entry.get('uploader') or '')
+    track_words = _title_words(track_name)
+    artist_words = _title_words(artist_name)
+    
+    score = 0.0
+    if track_words:
+        score += 3 * len(track_words & title_words) / len(track_words)
+    if artist_words:
+        score += 2 * len(artist_words & (title_words | channel_words)) / len(artist_words)
+    # Canales oficiales de YouTube Music ("Artista - Topic") suelen tener el audio exacto del álbum
+    if 'topic' in channel_words:
+        score += 0.5
+    score -= len((YOUTUBE_VERSION_WORDS & title_words) - track_words)
+    
+    duration = entry.get('duration')
+    if duration_ms and duration:
+        # Hasta 3 puntos si la duración coincide, bajando a 0 con 30 segundos de diferencia
+        diff = abs(duration - duration_ms / 1000)
+        score += 3 * max(0.0, 1 - diff / 30)
+        if diff > 90:
+            score -= 3
+    return score
+
+
+class YoutubeSearchError(Exception):
+    """La búsqueda no se pudo hacer (bloqueo por bot, timeout, red): no significa que la canción no exista"""
+
+
+def search_youtube_video_id(track_name: str, artist_name: str, duration_ms: Optional[int] = None) -> Optional[str]:
+    """
+    Busca una canción en YouTube y retorna el video_id del resultado que mejor coincide
+    (título, artista y duración), o None si la búsqueda no trajo resultados.
+    Una sola búsqueda sin extraer streams: el audio se resuelve al reproducir.
+    Lanza YoutubeSearchError si la búsqueda falla.
+    """
+    # Limpiar nombres para mejor búsqueda
+    clean_track = track_name.strip()
+    clean_artist = artist_name.strip().split(',')[0]  # Tomar solo el primer artista
+    query = f"{clean_track} {clean_artist}"
+    
+    ydl_opts = {
+        'quiet': True,
+        'no_warnings': True,
+        'extract_flat': 'in_playlist',  # Solo id, título, canal y duración de cada resultado
+        'noplaylist': True,
+        'socket_timeout': 15,
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    }
+    
+    # Agregar cookies si están disponibles
+    cookies_path = get_youtube_cookies_path()
+    if cookies_path:
+        ydl_opts['cookiefile'] = cookies_path
+    
+    host_rate_limiter("youtube.com").wait()
     try:
-        # Limpiar nombres para mejor búsqueda
-        clean_track = track_name.strip()
-        clean_artist = artist_name.strip().split(',')[0]  # Tomar solo el primer artista
-        query = f"{clean_track} {clean_artist}"
-        
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': 'incomplete',  # Extraer información básica primero para evitar bloqueos
-            'default_search': 'ytsearch1',
-            'noplaylist': True,
-            'socket_timeout': 15,
-            'extractor_args': {
-                'youtube': {
-                    'skip': ['dash', 'hls'],  # Evitar formatos que requieren descarga
-                }
-            },
-            'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-        }
-        
-        # Agregar cookies si están disponibles
-        cookies_path = get_youtube_cookies_path()
-        if cookies_path:
-            ydl_opts['cookiefile'] = cookies_path
-        
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            try:
-                search_query = f"ytsearch1:{query}"
-                search_results = ydl.extract_info(search_query, download=False)
-                
-                if search_results and 'entries' in search_results:
-                    entries = search_results['entries']
-                    if entries and len(entries) > 0:
-                        video = entries[0]
-                        # Si el video tiene URL directa, la usamos
-                        if 'url' in video and video['url']:
-                            return video['url']
-                        # Si tiene webpage_url, extraemos la URL de audio
-                        elif 'webpage_url' in video and video['webpage_url']:
-                            video_url = video['webpage_url']
-                            # Extraer URL de audio directamente
-                            ydl2_opts = {
-                                'format': 'bestaudio/best',
-                                'quiet': True,
-                                'no_warnings': True,
-                                'socket_timeout': 15,
-                                'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                            }
-                            # Agregar cookies si están disponibles
-                            cookies_path = get_youtube_cookies_path()
-                            if cookies_path:
-                                ydl2_opts['cookiefile'] = cookies_path
-                            with yt_dlp.YoutubeDL(ydl2_opts) as ydl2:
-                                info = ydl2.extract_info(video_url, download=False)
-                                if info and 'url' in info and info['url']:
-                                    return info['url']
-            except Exception as e:
-                # Si falla, intentamos con una búsqueda más simple
-                try:
-                    print(f"Primer intento falló para '{query}', intentando método alternativo...")
-                    # Método alternativo: buscar directamente el video ID si lo tenemos
-                    return None
-                except:
-                    print(f"Error extrayendo info de YouTube para '{query}': {str(e)}")
-                    return None
-                
+            search_results = ydl.extract_info(f"ytsearch{YOUTUBE_SEARCH_CANDIDATES}:{query}", download=False)
     except Exception as e:
-        print(f"Error buscando en YouTube para '{track_name} - {artist_name}': {str(e)}")
+        raise YoutubeSearchError(re.sub(r'\x1b\[[0-9;]*m', '', str(e))) from e
+    
+    candidates = [e for e in (search_results or {}).get('entries') or [] if e and e.get('id')]
+    if not candidates:
         return None
-    return None
+    best = max(candidates, key=lambda e: score_youtube_candidate(e, clean_track, artist_name, duration_ms))
+    return best['id']
+
+
+# Índice persistente canción de Spotify -> video de YouTube, para no repetir búsquedas al reimportar
+YOUTUBE_INDEX_DB_FILE = Path(os.getenv("YOUTUBE_INDEX_DB_FILE") or Path(__file__).parent / "youtube_index.db")
+# Espera antes de reintentar una canción que no se encontró: se duplica con cada fallo hasta el máximo
+YOUTUBE_INDEX_RETRY_BASE = 60 * 60
+YOUTUBE_INDEX_RETRY_MAX = 7 * 24 * 60 * 60
+
+
+def spotify_track_keys(track: Dict) -> List[str]:
+    """Claves de una canción de Spotify en el índice: su id y, si lo tiene, su ISRC"""
+    keys = [f"spotify:{track['id']}"] if track.get('id') else []
+    isrc = (track.get('external_ids') or {}).get('isrc')
+    if isrc:
+        keys.append(f"isrc:{isrc.upper()}")
+    return keys
+
+
+class YoutubeMatchIndex:
+    """
+    Resultados de búsquedas en YouTube por clave de canción (spotify:<id>, isrc:<código>), en SQLite.
+    Guarda también los fallos (caché negativo) con un momento a partir del cual se puede reintentar.
+    """
+    def __init__(self, path: Path) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS youtube_matches ("
+            " track_key TEXT PRIMARY KEY,"
+            " video_id TEXT,"
+            " failures INTEGER NOT NULL DEFAULT 0,"
+            " retry_at REAL NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        # track_key -> {'video_id', 'failures', 'retry_at'}
+        self._index: Dict[str, Dict] = {}
+        for track_key, video_id, failures, retry_at in self._conn.execute(
+            "SELECT track_key, video_id, failures, retry_at FROM youtube_matches"
+        ):
+            self._index[track_key] = {'video_id': video_id, 'failures': failures, 'retry_at': retry_at}
+        self.stats = {"hits": 0, "misses": 0, "backoff_skips": 0}
+
+    def lookup(self, keys: List[str]) -> tuple[Optional[str], bool]:
+        """Retorna (video_id conocido, si hay que esperar antes de volver a buscar)"""
+        entries = [self._index[k] for k in keys if k in self._index]
+        for entry in entries:
+            if entry['video_id']:
+                self.stats["hits"] += 1
+                return entry['video_id'], False
+        if any(entry['retry_at'] > time.time() for entry in entries):
+            self.stats["backoff_skips"] += 1
+            return None, True
+        self.stats["misses"] += 1
+        return None, False
+
+    def _save(self, keys: List[str], video_id: Optional[str], failures: int, retry_at: float) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO youtube_matches (track_key, video_id, failures, retry_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(key, video_id, failures, retry_at, now) for key in keys],
+            )
+            self._conn.commit()
+        for key in keys:
+            self._index[key] = {'video_id': video_id, 'failures': failures, 'retry_at': retry_at}
+
+    def record_match(self, keys: List[str], video_id: str) -> None:
+        self._save(keys, video_id, 0, 0)
+
+    def record_failure(self, keys: List[str]) -> None:
+        failures = max((self._index[k]['failures'] for k in keys if k in self._index), default=0) + 1
+        delay = min(YOUTUBE_INDEX_RETRY_BASE * 2 ** (failures - 1), YOUTUBE_INDEX_RETRY_MAX)
+        self._save(keys, None, failures, time.time() + delay)
+
+    def get_metrics(self) -> Dict:
+        return {
+            **self.stats,
+            "matches": sum(1 for entry in list(self._index.values()) if entry['video_id']),
+            "failures": sum(1 for entry in list(self._index.values()) if not entry['video_id']),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+youtube_match_index = YoutubeMatchIndex(YOUTUBE_INDEX_DB_FILE)
+
+
+def resolve_spotify_track_video_id(track: Dict) -> Optional[str]:
+    """video_id de YouTube para una canción de Spotify: primero el índice, si no una búsqueda (que se guarda en el índice)"""
+    keys = spotify_track_keys(track)
+    video_id, backoff = youtube_match_index.lookup(keys)
+    if video_id or backoff:
+        return video_id
+    artist_names = ', '.join([a['name'] for a in track['artists']])
+    try:
+        video_id = search_youtube_video_id(track['name'], artist_names, track.get('duration_ms'))
+    except YoutubeSearchError as e:
+        # Error pasajero: no se guarda como fallo, se vuelve a buscar en la próxima importación
+        print(f"Error buscando en YouTube para '{track['name']} - {artist_names}': {e}")
+        return None
+    if keys:
+        if video_id:
+            youtube_match_index.record_match(keys, video_id)
+        else:
+            youtube_match_index.record_failure(keys)
+    return video_id
+
+
+async def resolve_spotify_video_ids(spotify_tracks: List[Dict], on_result=None) -> List[Optional[str]]:
+    """
+    Resuelve varias canciones de Spotify en paralelo en el pool; los resultados respetan el orden de entrada.
+    `on_result` (async, opcional) se llama con cada resultado apenas está listo.
+    """
+    loop = asyncio.get_running_loop()
+
+    async def resolve(track: Dict) -> Optional[str]:
+        video_id = await loop.run_in_executor(youtube_search_executor, resolve_spotify_track_video_id, track)
+        if on_result:
+            await on_result(video_id)
+        return video_id
+
+    return await asyncio.gather(*(resolve(track) for track in spotify_tracks))
 
 
 def extract_playlist_id(playlist_url: str) -> Optional[str]:
@@ -939,6 +1620,30 @@ def extract_youtube_playlist_id(playlist_url: str) -> Optional[str]:
     return None
 
 
+# Títulos con los que YouTube lista los videos que ya no se pueden reproducir
+YOUTUBE_UNAVAILABLE_TITLES = {'Deleted video', 'Private video', '[Deleted video]', '[Private video]'}
+
+
+def build_youtube_track(video_id: str, title: str, channel: str, image_url: Optional[str]) -> Track:
+    """Track de un video de YouTube sin URL de audio (se carga bajo demanda a partir del video_id)"""
+    if ' - ' in title:
+        parts = title.split(' - ', 1)
+        artist = parts[0].strip()
+        song_title = parts[1].strip()
+    else:
+        song_title = title
+        artist = channel.replace(' - Topic', '') if channel else 'Artista desconocido'
+    
+    return Track(
+        id=f"yt_{video_id}",
+        title=f"{song_title} - {artist}",
+        url="",  # Se cargará bajo demanda
+        artist=artist,
+        video_id=video_id,
+        image_url=image_url
+    )
+
+
 def import_youtube_playlist(playlist_url: str) -> tuple[List[Track], str, int]:
     """Importa una playlist de YouTube Music y retorna tracks, nombre y cantidad omitida"""
     playlist_id = extract_youtube_playlist_id(playlist_url)
@@ -953,7 +1658,7 @@ def import_youtube_playlist(playlist_url: str) -> tuple[List[Track], str, int]:
         ydl_opts = {
             'quiet': True,
             'no_warnings': True,
-            'extract_flat': 'incomplete',  # Extraer información básica primero
+            'extract_flat': 'in_playlist',  # Solo el listado: id, título y miniatura de cada video, sin extraer streams
             'socket_timeout': 60,  # Timeout más largo
             'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
             'referer': 'https://www.youtube.com/',
@@ -976,10 +1681,6 @@ def import_youtube_playlist(playlist_url: str) -> tuple[List[Track], str, int]:
                 'Sec-Fetch-User': '?1',
                 'Cache-Control': 'max-age=0',
             },
-            # Opciones adicionales para reducir detección
-            'sleep_interval': 1,  # Esperar 1 segundo entre requests
-            'sleep_interval_requests': 1,
-            'sleep_interval_subtitles': 1,
         }
         
         # Agregar cookies si están disponibles (opcional)
@@ -1025,108 +1726,24 @@ def import_youtube_playlist(playlist_url: str) -> tuple[List[Track], str, int]:
             tracks = []
             tracks_without_url = 0
             
-            import time
-            
-            
-            for idx, entry in enumerate(entries):
-                if not entry:
-                    continue
-                
-                # Agregar delay progresivo para evitar rate limiting de YouTube
-                if idx > 0:
-                    if idx % 2 == 0:
-                        time.sleep(2)  # Esperar 2 segundos cada 2 videos
-                    if idx % 5 == 0:
-                        time.sleep(5)  # Esperar 5 segundos adicionales cada 5 videos
-                        print(f"Delay aplicado después de {idx} videos...")
-                
-                try:
-                    # Obtener información completa del video
-                    video_id = entry.get('id')
-                    if not video_id:
-                        continue
-                    
-                    video_url = f"https://www.youtube.com/watch?v={video_id}"
-                    
-                    # Extraer URL de audio con configuración mejorada
-                    audio_opts = {
-                        'format': 'bestaudio/best',
-                        'quiet': True,
-                        'no_warnings': True,
-                        'socket_timeout': 60,
-                        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36',
-                        'referer': 'https://www.youtube.com/',
-                        'extractor_args': {
-                            'youtube': {
-                                'player_client': ['android', 'ios', 'web'],  # Intentar múltiples clientes
-                                'player_skip': ['webpage', 'configs'],
-                            }
-                        },
-                        'http_headers': {
-                            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
-                            'Accept-Language': 'es-ES,es;q=0.9,en-US;q=0.8,en;q=0.7',
-                            'Accept-Encoding': 'gzip, deflate, br',
-                            'DNT': '1',
-                            'Connection': 'keep-alive',
-                            'Upgrade-Insecure-Requests': '1',
-                            'Sec-Fetch-Dest': 'document',
-                            'Sec-Fetch-Mode': 'navigate',
-                            'Sec-Fetch-Site': 'none',
-                            'Sec-Fetch-User': '?1',
-                            'Cache-Control': 'max-age=0',
-                        },
-                        'sleep_interval': 1,
-                        'sleep_interval_requests': 1,
-                    }
-                    
-                    # Agregar cookies si están disponibles (opcional)
-                    cookies_path = get_youtube_cookies_path()
-                    if cookies_path:
-                        audio_opts['cookiefile'] = cookies_path
-                    
-                    with yt_dlp.YoutubeDL(audio_opts) as audio_ydl:
-                        try:
-                            video_info = audio_ydl.extract_info(video_url, download=False)
-                            
-                            if video_info and 'url' in video_info and video_info['url']:
-                                title = video_info.get('title', entry.get('title', 'Sin título'))
-                                # Obtener thumbnail de YouTube
-                                thumbnail = video_info.get('thumbnail') or entry.get('thumbnail')
-                                track_obj = Track(
-                                    id=f"youtube_{video_id}",
-                                    title=title,
-                                    url=video_info['url'],
-                                    image_url=thumbnail
-                                )
-                                tracks.append(track_obj)
-                                print(f"✓ YouTube ({idx+1}/{len(entries)}): {title}")
-                            else:
-                                tracks_without_url += 1
-                                print(f"✗ No se pudo obtener URL de audio para: {entry.get('title', 'Sin título')}")
-                        except Exception as extract_error:
-                            # Si falla la extracción, intentar usar el video_id directamente
-                            # y construir una URL que el frontend pueda usar
-                            tracks_without_url += 1
-                            error_msg = str(extract_error)
-                            if "Sign in to confirm" in error_msg or "bot" in error_msg.lower():
-                                print(f"⚠ YouTube bloqueó la solicitud para: {entry.get('title', 'Sin título')}")
-                            else:
-                                print(f"Error extrayendo audio: {error_msg[:100]}")
-                            
-                except Exception as e:
+            # Tracks livianos como en la importación autenticada: el audio se resuelve al reproducir
+            for entry in entries:
+                video_id = entry.get('id') if entry else None
+                title = entry.get('title') if entry else None
+                if not video_id or not title or title in YOUTUBE_UNAVAILABLE_TITLES:
                     tracks_without_url += 1
-                    error_msg = str(e)
-                    if "Sign in to confirm" in error_msg or "bot" in error_msg.lower():
-                        print(f"⚠ YouTube bloqueó la solicitud (video {idx+1})")
-                    else:
-                        print(f"Error procesando video: {error_msg[:100]}")
                     continue
+                thumbnails = entry.get('thumbnails') or []
+                image_url = thumbnails[-1].get('url') if thumbnails else entry.get('thumbnail')
+                channel = entry.get('channel') or entry.get('uploader') or ''
+                tracks.append(build_youtube_track(video_id, title, channel, image_url))
+            print(f"✓ YouTube: {len(tracks)} videos en '{playlist_name}' ({tracks_without_url} no disponibles)")
             
             if not tracks and tracks_without_url > 0:
-                # Si no se pudo obtener ninguna canción y hay errores de bot
+                # Todos los videos de la playlist están borrados o son privados
                 raise HTTPException(
                     status_code=400,
-                    detail=f"YouTube está bloqueando las solicitudes automáticas. Se intentaron {len(entries)} canciones pero ninguna pudo ser procesada debido a restricciones anti-bot. Intenta más tarde o considera usar una playlist de Spotify."
+                    detail=f"Ninguno de los {len(entries)} videos de la playlist está disponible (borrados o privados)."
                 )
             
             return tracks, playlist_name, tracks_without_url
@@ -1153,212 +1770,497 @@ def import_youtube_playlist(playlist_url: str) -> tuple[List[Track], str, int]:
         )
 
 
-@app.post("/playlist/import")
-async def import_playlist(playlist_data: PlaylistImport):
-    """Importa una playlist de Spotify o YouTube Music y actualiza los tracks del juego"""
-    try:
-        playlist_url = playlist_data.playlist_url.strip()
-        room_name_param = playlist_data.room_name
-        
-        # Obtener la sala correcta
-        target_room = None
-        if room_name_param:
-            target_room = await room_manager.get_room(room_name_param)
-            if not target_room:
-                raise HTTPException(status_code=404, detail="Sala no encontrada")
-        else:
-            target_room = room  # Usar sala por defecto para compatibilidad
-        
-        # Obtener source del modelo, con valor por defecto
-        source = getattr(playlist_data, 'source', None)
-        if source:
-            source = source.lower()
-        
-        # Detectar automáticamente la fuente basándose en la URL (tiene prioridad)
-        # Esto asegura que incluso si el frontend envía un source incorrecto, se detecte correctamente
-        if "youtube.com" in playlist_url or "music.youtube.com" in playlist_url or "youtu.be" in playlist_url:
-            source = "youtube"
-        elif "spotify.com" in playlist_url or "open.spotify.com" in playlist_url:
-            source = "spotify"
-        elif not source:
-            # Si no se puede detectar y no hay source, asumir Spotify por defecto
-            source = "spotify"
-        
-        
-        # Importar desde YouTube Music
-        if source == "youtube":
+# Playlists ya importadas, por id y versión del proveedor (snapshot_id de Spotify, etag de la API de YouTube)
+PLAYLIST_CACHE_DIR = Path(os.getenv("PLAYLIST_CACHE_DIR") or Path(__file__).parent / "playlist_cache")
+# La versión de YouTube (etag + cantidad de videos) no ve reemplazos ni reordenamientos, así que sus entradas vencen
+PLAYLIST_CACHE_YOUTUBE_MAX_AGE = int(os.getenv("PLAYLIST_CACHE_YOUTUBE_MAX_AGE", "3600"))  # segundos
+
+
+class PlaylistCache:
+    """
+    Tracks de playlists importadas, guardados como JSON (uno por playlist).
+    Una entrada sirve mientras la versión que reporta el proveedor sea la misma con la que se guardó.
+    """
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Dict] = {}
+        self.stats = {"hits": 0, "misses": 0, "stale": 0}
+
+    def _path(self, source: str, playlist_id: str) -> Path:
+        return self.directory / f"{source}_{hashlib.sha1(playlist_id.encode('utf-8')).hexdigest()[:16]}.json"
+
+    def _load(self, source: str, playlist_id: str) -> Optional[Dict]:
+        key = f"{source}:{playlist_id}"
+        entry = self._entries.get(key)
+        if entry is None:
+            path = self._path(source, playlist_id)
+            if not path.exists():
+                return None
             try:
-                # Intentar primero con API autenticada si está disponible
-                youtube_service = get_youtube_service()
-                if youtube_service:
-                    try:
-                        playlist_id = extract_youtube_playlist_id(playlist_url)
-                        if playlist_id:
-                            tracks_list, playlist_name = import_youtube_playlist_authenticated(playlist_id)
-                            # Convertir a formato Track y agregar URLs vacías (se cargarán bajo demanda)
-                            tracks = tracks_list
-                            tracks_without_url = 0
-                        else:
-                            raise HTTPException(status_code=400, detail="ID de playlist de YouTube inválido")
-                    except HTTPException:
-                        raise
-                    except Exception as e:
-                        # Si falla la API autenticada, intentar con yt-dlp como fallback
-                        print(f"Error con API autenticada, usando yt-dlp como fallback: {str(e)}")
-                        tracks, playlist_name, tracks_without_url = import_youtube_playlist(playlist_url)
-                else:
-                    # Sin autenticación, usar yt-dlp (puede fallar por bloqueos de YouTube)
-                    tracks, playlist_name, tracks_without_url = import_youtube_playlist(playlist_url)
-                
-                if not tracks:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"No se pudieron obtener canciones de la playlist de YouTube. Verifica que la playlist sea pública y tenga videos disponibles. Si el problema persiste, intenta iniciar sesión con YouTube Music usando el botón 'Conectar cuenta de YouTube'."
-                    )
-                
-                await target_room.update_tracks(tracks)
-                if room_name_param:
-                    await manager.broadcast(build_state_message(target_room), room_name_param)
-                else:
-                    await manager.broadcast(build_state_message(target_room))
-                
-                message = f"Playlist de YouTube importada exitosamente. {len(tracks)} canciones cargadas."
-                if tracks_without_url > 0:
-                    message += f" {tracks_without_url} canciones no pudieron ser procesadas."
-                
-                return {
-                    "message": message,
-                    "playlist_name": playlist_name,
-                    "tracks_count": len(tracks),
-                    "tracks_skipped": tracks_without_url,
-                    "tracks": [t.model_dump() for t in tracks],
-                }
-            except HTTPException:
-                # Re-lanzar errores HTTP directamente
-                raise
-            except HTTPException:
-                # Re-lanzar errores HTTP directamente
-                raise
-            except Exception as e:
-                # Cualquier otro error al importar de YouTube
-                error_msg = str(e)
-                # Limpiar códigos ANSI del mensaje de error
-                import re
-                error_msg = re.sub(r'\x1b\[[0-9;]*m', '', error_msg)
-                
-                if "Sign in to confirm" in error_msg or "bot" in error_msg.lower() or "Sign in" in error_msg:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"YouTube está bloqueando las solicitudes automáticas (detección de bot). Soluciones: 1) Espera 10-15 minutos y vuelve a intentar, 2) Usa una playlist de Spotify en su lugar (más confiable), 3) La playlist puede ser privada o tener restricciones. Nota: YouTube puede bloquear solicitudes automáticas incluso con configuración optimizada."
-                    )
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Error leyendo playlist guardada {path.name}: {e}")
+                return None
+            self._entries[key] = entry
+        return entry
+
+    def get(self, source: str, playlist_id: str, version: Optional[str], max_age: Optional[float] = None) -> Optional[Dict]:
+        """Retorna {'playlist_name', 'tracks': [Track]} si la copia guardada está al día (y tiene menos de `max_age` segundos)"""
+        entry = self._load(source, playlist_id) if version else None
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        # Entradas con canciones omitidas (guardadas por versiones anteriores) no sirven: hay que reintentarlas
+        expired = max_age is not None and time.time() - entry.get('cached_at', 0) > max_age
+        if entry['version'] != version or entry.get('tracks_skipped') or expired:
+            self.stats["stale"] += 1
+            return None
+        self.stats["hits"] += 1
+        return {
+            "playlist_name": entry['playlist_name'],
+            "tracks": [Track(**t) for t in entry['tracks']],
+        }
+
+    def put(self, source: str, playlist_id: str, version: Optional[str], playlist_name: str, tracks: List[Track]) -> None:
+        if not version:
+            return
+        entry = {
+            "version": version,
+            "playlist_name": playlist_name,
+            "tracks": [t.model_dump() for t in tracks],
+            "cached_at": time.time(),
+        }
+        path = self._path(source, playlist_id)
+        with self._lock:
+            self._entries[f"{source}:{playlist_id}"] = entry
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+
+    def get_metrics(self) -> Dict:
+        return {**self.stats, "loaded": len(self._entries)}
+
+
+playlist_cache = PlaylistCache(PLAYLIST_CACHE_DIR)
+
+
+def fetch_spotify_snapshot_id(playlist_id: str) -> Optional[str]:
+    """Versión actual de una playlist de Spotify (pedido liviano, sin las canciones)"""
+    return get_spotify_client().playlist(playlist_id, fields="snapshot_id").get("snapshot_id")
+
+
+def fetch_spotify_playlist(playlist_id: str) -> tuple[Dict, List[Dict]]:
+    """Trae la playlist de Spotify y todas sus canciones (paginando)"""
+    sp = get_spotify_client()
+    playlist = sp.playlist(playlist_id)
+    spotify_tracks = []
+    results = playlist["tracks"]
+    while results:
+        for item in results["items"]:
+            if item["track"]:
+                spotify_tracks.append(item["track"])
+        if results["next"]:
+            results = sp.next(results)
+        else:
+            break
+    return playlist, spotify_tracks
+
+
+def detect_playlist_source(playlist_url: str, source: Optional[str]) -> str:
+    """Fuente de una playlist ('spotify' o 'youtube'); la URL tiene prioridad sobre lo que envía el frontend"""
+    if source:
+        source = source.lower()
+    if "youtube.com" in playlist_url or "music.youtube.com" in playlist_url or "youtu.be" in playlist_url:
+        return "youtube"
+    if "spotify.com" in playlist_url or "open.spotify.com" in playlist_url:
+        return "spotify"
+    # Si no se puede detectar y no hay source, asumir Spotify por defecto
+    return source or "spotify"
+
+
+async def run_playlist_import(playlist_url: str, source: str, job: "ImportJob") -> Dict:
+    """Importa una playlist de Spotify o YouTube Music y retorna sus tracks (las partes bloqueantes corren en hilos)"""
+    # Importar desde YouTube Music
+    if source == "youtube":
+        try:
+            await job.report(stage="Leyendo playlist de YouTube", force=True)
+            # Intentar primero con API autenticada si está disponible (refrescar el token y armar el cliente bloquean: en un hilo)
+            youtube_service = await asyncio.to_thread(get_youtube_service)
+            if youtube_service:
+                try:
+                    playlist_id = extract_youtube_playlist_id(playlist_url)
+                    if playlist_id:
+                        tracks_list, playlist_name = await asyncio.to_thread(import_youtube_playlist_authenticated, youtube_service, playlist_id)
+                        # Convertir a formato Track y agregar URLs vacías (se cargarán bajo demanda)
+                        tracks = tracks_list
+                        tracks_without_url = 0
+                    else:
+                        raise HTTPException(status_code=400, detail="ID de playlist de YouTube inválido")
+                except HTTPException:
+                    raise
+                except Exception as e:
+                    # Si falla la API autenticada, intentar con yt-dlp como fallback
+                    print(f"Error con API autenticada, usando yt-dlp como fallback: {str(e)}")
+                    tracks, playlist_name, tracks_without_url = await asyncio.to_thread(import_youtube_playlist, playlist_url)
+            else:
+                # Sin autenticación, usar yt-dlp (puede fallar por bloqueos de YouTube)
+                tracks, playlist_name, tracks_without_url = await asyncio.to_thread(import_youtube_playlist, playlist_url)
+            
+            if not tracks:
                 raise HTTPException(
-                    status_code=500,
-                    detail=f"Error importando playlist de YouTube: {error_msg[:400]}"
+                    status_code=400,
+                    detail=f"No se pudieron obtener canciones de la playlist de YouTube. Verifica que la playlist sea pública y tenga videos disponibles. Si el problema persiste, intenta iniciar sesión con YouTube Music usando el botón 'Conectar cuenta de YouTube'."
                 )
-        
-        # Importar desde Spotify (solo si no es YouTube)
-        if source != "youtube":
-            playlist_id = extract_playlist_id(playlist_url)
             
-            if not playlist_id:
+            message = f"Playlist de YouTube importada exitosamente. {len(tracks)} canciones cargadas."
+            if tracks_without_url > 0:
+                message += f" {tracks_without_url} canciones no pudieron ser procesadas."
+            
+            return {
+                "message": message,
+                "playlist_name": playlist_name,
+                "tracks": tracks,
+                "tracks_skipped": tracks_without_url,
+            }
+        except HTTPException:
+            # Re-lanzar errores HTTP directamente
+            raise
+        except Exception as e:
+            # Cualquier otro error al importar de YouTube
+            error_msg = str(e)
+            # Limpiar códigos ANSI del mensaje de error
+            error_msg = re.sub(r'\x1b\[[0-9;]*m', '', error_msg)
+            
+            if "Sign in to confirm" in error_msg or "bot" in error_msg.lower() or "Sign in" in error_msg:
                 raise HTTPException(
                     status_code=400,
-                    detail=f"URL de playlist inválida. La URL recibida fue: '{playlist_url}'. Por favor proporciona una URL válida de Spotify (ej: https://open.spotify.com/playlist/...) o solo el ID de la playlist."
+                    detail=f"YouTube está bloqueando las solicitudes automáticas (detección de bot). Soluciones: 1) Espera 10-15 minutos y vuelve a intentar, 2) Usa una playlist de Spotify en su lugar (más confiable), 3) La playlist puede ser privada o tener restricciones. Nota: YouTube puede bloquear solicitudes automáticas incluso con configuración optimizada."
                 )
+            raise HTTPException(
+                status_code=500,
+                detail=f"Error importando playlist de YouTube: {error_msg[:400]}"
+            )
+    
+    # Importar desde Spotify
+    playlist_id = extract_playlist_id(playlist_url)
+    if not playlist_id:
+        raise HTTPException(
+            status_code=400,
+            detail=f"URL de playlist inválida. La URL recibida fue: '{playlist_url}'. Por favor proporciona una URL válida de Spotify (ej: https://open.spotify.com/playlist/...) o solo el ID de la playlist."
+        )
+    
+    # Si la playlist no cambió desde la última importación, usar la copia guardada
+    await job.report(stage="Verificando playlist de Spotify", force=True)
+    snapshot_id = await asyncio.to_thread(fetch_spotify_snapshot_id, playlist_id)
+    cached = playlist_cache.get("spotify", playlist_id, snapshot_id)
+    if cached:
+        tracks = cached["tracks"]
+        await job.report(stage="Playlist sin cambios", total=len(tracks), resolved=len(tracks), force=True)
+        message = f"Playlist importada exitosamente. {len(tracks)} canciones cargadas."
+        return {**cached, "tracks_skipped": 0, "message": message}
+    
+    await job.report(stage="Leyendo playlist de Spotify", force=True)
+    playlist, spotify_tracks = await asyncio.to_thread(fetch_spotify_playlist, playlist_id)
+    
+    # Las canciones sin preview_url de Spotify se buscan en YouTube (salvo las que ya están en el índice)
+    pending = [t for t in spotify_tracks if not t.get("preview_url")]
+    print(f"Resolviendo en YouTube {len(pending)} canciones ({YOUTUBE_SEARCH_WORKERS} en paralelo)...")
+    await job.report(stage="Buscando canciones en YouTube", total=len(spotify_tracks),
+                     resolved=len(spotify_tracks) - len(pending), force=True)
+    
+    async def on_search_result(video_id: Optional[str]) -> None:
+        if video_id:
+            await job.report(resolved=job.resolved + 1)
+        else:
+            await job.report(skipped=job.skipped + 1)
+    
+    found_video_ids = await resolve_spotify_video_ids(pending, on_result=on_search_result)
+    youtube_video_ids = {id(t): video_id for t, video_id in zip(pending, found_video_ids)}
+    
+    tracks = []
+    tracks_without_url = 0
+    tracks_found = 0
+    
+    for track in spotify_tracks:
+        track_name = track['name']
+        artist_names = ', '.join([a['name'] for a in track['artists']])
+        full_title = f"{track_name} - {artist_names}"
         
-        sp = get_spotify_client()
-        playlist = sp.playlist(playlist_id)
-        
-        tracks = []
-        results = playlist["tracks"]
-        tracks_without_url = 0
-        tracks_found = 0
+        # Primero intentamos usar preview_url de Spotify si está disponible;
+        # si no, el video encontrado en YouTube (el audio se carga bajo demanda)
+        audio_url = track.get("preview_url") or ""
+        video_id = None if audio_url else youtube_video_ids.get(id(track))
+        source = "youtube" if video_id else "spotify_preview"
         
-        while results:
-            for item in results["items"]:
-                track = item["track"]
-                if track:
-                    track_name = track['name']
-                    artist_names = ', '.join([a['name'] for a in track['artists']])
-                    full_title = f"{track_name} - {artist_names}"
-                    
-                    # Primero intentamos usar preview_url de Spotify si está disponible
-                    audio_url = track.get("preview_url")
-                    source = "spotify_preview"
-                    
-                    # Si no hay preview_url, buscamos en YouTube
-                    if not audio_url:
-                        print(f"Buscando en YouTube: {full_title}")
-                        audio_url = search_youtube_audio_url(track_name, artist_names)
-                        if audio_url:
-                            source = "youtube"
-                    
-                    if audio_url:
-                        # Obtener imagen del álbum (preferir medium, luego large, luego small)
-                        image_url = None
-                        album = track.get('album', {})
-                        images = album.get('images', [])
-                        if images:
-                            # Buscar imagen medium (300x300) o la más grande disponible
-                            for img in images:
-                                if img.get('width', 0) >= 300:
-                                    image_url = img.get('url')
-                                    break
-                            # Si no hay medium, usar la primera (generalmente la más grande)
-                            if not image_url and images:
-                                image_url = images[0].get('url')
-                        
-                        track_obj = Track(
-                            id=f"spotify_{track['id']}",
-                            title=full_title,
-                            url=audio_url,
-                            artist=artist_names,
-                            image_url=image_url
-                        )
-                        tracks.append(track_obj)
-                        tracks_found += 1
-                        print(f"✓ Encontrada ({source}): {full_title}")
-                    else:
-                        tracks_without_url += 1
-                        print(f"✗ No se pudo encontrar URL de audio para: {full_title}")
+        if audio_url or video_id:
+            # Obtener imagen del álbum (preferir medium, luego large, luego small)
+            image_url = None
+            album = track.get('album', {})
+            images = album.get('images', [])
+            if images:
+                # Buscar imagen medium (300x300) o la más grande disponible
+                for img in images:
+                    if img.get('width', 0) >= 300:
+                        image_url = img.get('url')
+                        break
+                # Si no hay medium, usar la primera (generalmente la más grande)
+                if not image_url and images:
+                    image_url = images[0].get('url')
             
-            if results["next"]:
-                results = sp.next(results)
-            else:
-                break
-        
-        if not tracks:
-            total_attempted = tracks_without_url + tracks_found
-            detail_msg = f"No se pudieron encontrar URLs de audio para las canciones de esta playlist. "
-            detail_msg += f"Se intentaron {total_attempted} canciones pero ninguna pudo ser procesada. "
-            detail_msg += f"Esto puede deberse a: (1) Restricciones de región en Spotify, (2) YouTube bloqueando solicitudes automáticas, "
-            detail_msg += f"o (3) Problemas de conexión. Intenta con otra playlist o verifica tu conexión a internet."
-            raise HTTPException(status_code=400, detail=detail_msg)
-        
-        await target_room.update_tracks(tracks)
-        if room_name_param:
-            await manager.broadcast(build_state_message(target_room), room_name_param)
+            track_obj = Track(
+                id=f"spotify_{track['id']}",
+                title=full_title,
+                url=audio_url,
+                artist=artist_names,
+                video_id=video_id,
+                image_url=image_url
+            )
+            tracks.append(track_obj)
+            tracks_found += 1
+            print(f"✓ Encontrada ({source}): {full_title}")
         else:
-            await manager.broadcast(build_state_message(target_room))
-        
-        message = f"Playlist importada exitosamente. {tracks_found} canciones cargadas."
-        if tracks_without_url > 0:
-            message += f" {tracks_without_url} canciones no pudieron ser procesadas (sin preview URL disponible y YouTube bloqueado)."
-        
-        return {
-            "message": message,
-            "playlist_name": playlist["name"],
-            "tracks_count": len(tracks),
-            "tracks_skipped": tracks_without_url,
-            "tracks": [t.model_dump() for t in tracks],
+            tracks_without_url += 1
+            print(f"✗ No se pudo encontrar URL de audio para: {full_title}")
+    
+    if not tracks:
+        total_attempted = tracks_without_url + tracks_found
+        detail_msg = f"No se pudieron encontrar URLs de audio para las canciones de esta playlist. "
+        detail_msg += f"Se intentaron {total_attempted} canciones pero ninguna pudo ser procesada. "
+        detail_msg += f"Esto puede deberse a: (1) Restricciones de región en Spotify, (2) YouTube bloqueando solicitudes automáticas, "
+        detail_msg += f"o (3) Problemas de conexión. Intenta con otra playlist o verifica tu conexión a internet."
+        raise HTTPException(status_code=400, detail=detail_msg)
+    
+    # Solo se guardan importaciones completas: las canciones omitidas se reintentan en la próxima
+    # importación (el índice de YouTube decide si ya corresponde volver a buscarlas)
+    if tracks_without_url == 0:
+        playlist_cache.put("spotify", playlist_id, playlist.get("snapshot_id"), playlist["name"], tracks)
+    
+    message = f"Playlist importada exitosamente. {tracks_found} canciones cargadas."
+    if tracks_without_url > 0:
+        message += f" {tracks_without_url} canciones no pudieron ser procesadas (sin preview URL disponible y YouTube bloqueado)."
+    
+    return {
+        "message": message,
+        "playlist_name": playlist["name"],
+        "tracks": tracks,
+        "tracks_skipped": tracks_without_url,
+    }
+
+
+# Importaciones en segundo plano: el request retorna un job_id y el progreso viaja por el WebSocket de la sala
+IMPORT_PROGRESS_INTERVAL = 0.5  # Mínimo de segundos entre mensajes de progreso
+IMPORT_JOB_RETENTION = 30 * 60  # Segundos que se conserva un job terminado para consultar su resultado
+
+
+class ImportJob:
+    """Importación de una playlist corriendo en segundo plano (compartida por todas las salas que la pidieron)"""
+    def __init__(self, playlist_url: str, source: str, key: tuple[str, str]) -> None:
+        self.id = uuid.uuid4().hex
+        self.playlist_url = playlist_url
+        self.source = source
+        self.key = key
+        # Salas que reciben el resultado: (nombre de la sala o None para la sala por defecto, instancia)
+        self.targets: List[tuple[Optional[str], Room]] = []
+        self.status = "pending"  # pending, running, done, error, cancelled
+        self.stage = "En cola"
+        self.total = 0
+        self.resolved = 0
+        self.skipped = 0
+        self.result: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.error_status: Optional[int] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self._last_report = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "error", "cancelled")
+
+    def attach(self, room_name: Optional[str], target_room: Room) -> None:
+        if not any(existing is target_room for _, existing in self.targets):
+            self.targets.append((room_name, target_room))
+
+    def detach(self, room_name: Optional[str]) -> None:
+        self.targets = [(name, target) for name, target in self.targets if name != room_name]
+
+    def to_dict(self, include_tracks: bool = False) -> Dict:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "stage": self.stage,
+            "source": self.source,
+            "room_names": [name for name, _ in self.targets],
+            "total": self.total,
+            "resolved": self.resolved,
+            "skipped": self.skipped,
+            "error": self.error,
         }
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error importing playlist: {str(e)}"
-        )
+        if self.result:
+            data.update({k: v for k, v in self.result.items() if k != "tracks"})
+            if include_tracks:
+                data["tracks"] = self.result["tracks"]
+        return data
+
+    async def report(self, force: bool = False, **fields) -> None:
+        """Actualiza el progreso y lo envía a las salas (como mucho cada IMPORT_PROGRESS_INTERVAL salvo `force`)"""
+        for name, value in fields.items():
+            setattr(self, name, value)
+        now = time.monotonic()
+        if force or now - self._last_report >= IMPORT_PROGRESS_INTERVAL:
+            self._last_report = now
+            message = encode_message({"type": "import_progress", "payload": self.to_dict()})
+            for room_name in {name for name, _ in self.targets}:
+                await manager.broadcast(message, room_name)
+
+
+def playlist_import_key(playlist_url: str, source: str) -> tuple[str, str]:
+    """Clave de una importación: dos pedidos de la misma playlist comparten el mismo job"""
+    playlist_id = extract_youtube_playlist_id(playlist_url) if source == "youtube" else extract_playlist_id(playlist_url)
+    return source, playlist_id or playlist_url
+
+
+class ImportJobManager:
+    """
+    Jobs de importación por id. Mientras una playlist se está importando, los pedidos de la misma
+    (source, playlist_id) se suman al job en curso en lugar de repetir las consultas a Spotify/YouTube.
+    """
+    def __init__(self) -> None:
+        self.jobs: Dict[str, ImportJob] = {}
+        self._inflight: Dict[tuple[str, str], ImportJob] = {}
+        self._final_reports: set = set()
+        self.stats = {"started": 0, "deduplicated": 0}
+
+    def start(self, playlist_url: str, source: str, room_name: Optional[str], target_room: Room) -> ImportJob:
+        self._prune()
+        key = playlist_import_key(playlist_url, source)
+        job = self._inflight.get(key)
+        if job and not job.finished:
+            self.stats["deduplicated"] += 1
+            job.attach(room_name, target_room)
+            return job
+        job = ImportJob(playlist_url, source, key)
+        job.attach(room_name, target_room)
+        self.jobs[job.id] = job
+        self._inflight[key] = job
+        self.stats["started"] += 1
+        job.task = asyncio.create_task(self._run(job))
+        job.task.add_done_callback(lambda task: self._task_done(job, task))
+        return job
+
+    async def _run(self, job: ImportJob) -> None:
+        try:
+            await job.report(status="running", force=True)
+            result = await run_playlist_import(job.playlist_url, job.source, job)
+            tracks = result["tracks"]
+            # Recorrer por índice: una sala puede sumarse mientras se actualizan las anteriores
+            i = 0
+            while i < len(job.targets):
+                room_name, target_room = job.targets[i]
+                await target_room.update_tracks(tracks)
+                await manager.broadcast(build_state_message(target_room), room_name)
+                i += 1
+            job.result = {
+                "message": result["message"],
+                "playlist_name": result["playlist_name"],
+                "tracks_count": len(tracks),
+                "tracks_skipped": result["tracks_skipped"],
+                # Tracks sin URL: el audio se resuelve al reproducir a partir del video_id
+                "requires_audio_fetch": any(t.video_id and not t.url for t in tracks),
+                "tracks": [t.model_dump() for t in tracks],
+            }
+            job.status = "done"
+            job.stage = "Importación terminada"
+        except asyncio.CancelledError:
+            job.status = "cancelled"
+            job.stage = "Importación cancelada"
+        except HTTPException as e:
+            job.status = "error"
+            job.error = str(e.detail)
+            job.error_status = e.status_code
+        except Exception as e:
+            job.status = "error"
+            job.error = f"Error importing playlist: {str(e)}"
+        await job.report(force=True)
+
+    def _task_done(self, job: ImportJob, task: asyncio.Task) -> None:
+        # En un callback y no en _run: una tarea cancelada antes de arrancar nunca ejecuta el cuerpo de _run
+        if self._inflight.get(job.key) is job:
+            del self._inflight[job.key]
+        job.finished_at = time.time()
+        if not job.finished:
+            job.status = "cancelled"
+            job.stage = "Importación cancelada"
+            report = asyncio.create_task(job.report(force=True))
+            self._final_reports.add(report)
+            report.add_done_callback(self._final_reports.discard)
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        return self.jobs.get(job_id)
+
+    async def cancel(self, job_id: str, room_name: Optional[str] = None) -> bool:
+        """Cancela un job; si otras salas esperan la misma playlist, solo se desengancha `room_name`"""
+        job = self.jobs.get(job_id)
+        if not job or job.finished or not job.task:
+            return False
+        if room_name is not None and any(name != room_name for name, _ in job.targets):
+            job.detach(room_name)
+            payload = {**job.to_dict(), "status": "cancelled", "stage": "Importación cancelada"}
+            await manager.broadcast({"type": "import_progress", "payload": payload}, room_name)
+            return True
+        job.task.cancel()
+        return True
+
+    def _prune(self) -> None:
+        limit = time.time() - IMPORT_JOB_RETENTION
+        self.jobs = {job_id: job for job_id, job in self.jobs.items() if not job.finished_at or job.finished_at > limit}
+
+    def get_metrics(self) -> Dict:
+        return {**self.stats, "running": len(self._inflight)}
+
+
+import_jobs = ImportJobManager()
+
+
+@app.post("/playlist/import")
+async def import_playlist(playlist_data: PlaylistImport):
+    """Encola la importación de una playlist de Spotify o YouTube Music; retorna el job_id sin esperar a que termine"""
+    playlist_url = playlist_data.playlist_url.strip()
+    room_name_param = playlist_data.room_name
+    
+    # Obtener la sala correcta
+    if room_name_param:
+        target_room = await room_manager.get_room(room_name_param)
+        if not target_room:
+            raise HTTPException(status_code=404, detail="Sala no encontrada")
+    else:
+        target_room = room  # Usar sala por defecto para compatibilidad
+    
+    source = detect_playlist_source(playlist_url, getattr(playlist_data, 'source', None))
+    job = import_jobs.start(playlist_url, source, room_name_param, target_room)
+    return job.to_dict()
+
+
+@app.get("/playlist/jobs/{job_id}")
+async def get_import_job(job_id: str):
+    """Estado de una importación (incluye los tracks cuando terminó)"""
+    job = import_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    return job.to_dict(include_tracks=True)
+
+
+@app.post("/playlist/jobs/{job_id}/cancel")
+async def cancel_import_job(job_id: str, room_name: Optional[str] = None):
+    """Cancela una importación en curso (o solo para `room_name` si otras salas esperan la misma playlist)"""
+    if not await import_jobs.cancel(job_id, room_name):
+        raise HTTPException(status_code=404, detail="No hay una importación en curso con ese id")
+    return {"success": True, "job_id": job_id}
 
 
 @app.get("/auth/youtube/authorize")
@@ -1514,22 +2416,35 @@ def get_youtube_service():
     return None
 
 
-def import_youtube_playlist_authenticated(playlist_id: str) -> tuple[List[Track], str]:
-    """Importa una playlist de YouTube usando la API autenticada (sin delays, sin detección de bots)"""
-    youtube = get_youtube_service()
-    if not youtube:
-        raise HTTPException(status_code=401, detail="No autenticado con YouTube. Inicia sesión primero.")
-    
+def fetch_youtube_playlist_info(youtube, playlist_id: str) -> Optional[tuple[str, str]]:
+    """
+    Nombre y versión de una playlist de YouTube con un solo pedido (None si no existe o es privada).
+    La versión es el etag del recurso playlist más la cantidad de videos: detecta altas y bajas,
+    pero no siempre un reemplazo o un cambio de orden que deje el total igual. Por eso las entradas
+    de YouTube del cache vencen a los PLAYLIST_CACHE_YOUTUBE_MAX_AGE segundos.
+    """
+    response = youtube.playlists().list(
+        part="snippet,contentDetails",
+        id=playlist_id
+    ).execute()
+    if not response.get('items'):
+        return None
+    playlist = response['items'][0]
+    item_count = playlist.get('contentDetails', {}).get('itemCount')
+    return playlist['snippet']['title'], f"{playlist.get('etag', '')}:{item_count}"
+
+
+def import_youtube_playlist_authenticated(youtube, playlist_id: str) -> tuple[List[Track], str]:
+    """Importa una playlist de YouTube con el cliente autenticado de get_youtube_service (sin delays, sin detección de bots)"""
     try:
-        playlist_response = youtube.playlists().list(
-            part="snippet",
-            id=playlist_id
-        ).execute()
-        
-        if not playlist_response.get('items'):
+        info = fetch_youtube_playlist_info(youtube, playlist_id)
+        if not info:
             raise HTTPException(status_code=404, detail="Playlist no encontrada o es privada")
         
-        playlist_name = playlist_response['items'][0]['snippet']['title']
+        playlist_name, version = info
+        cached = playlist_cache.get("youtube", playlist_id, version, max_age=PLAYLIST_CACHE_YOUTUBE_MAX_AGE)
+        if cached:
+            return cached["tracks"], cached["playlist_name"]
         
         tracks = []
         next_page_token = None
@@ -1552,17 +2467,9 @@ def import_youtube_playlist_authenticated(playlist_id: str) -> tuple[List[Track]
                 title = snippet.get('title', 'Sin título')
                 channel = snippet.get('videoOwnerChannelTitle', '')
                 
-                if title in ['Deleted video', 'Private video']:
+                if title in YOUTUBE_UNAVAILABLE_TITLES:
                     continue
                 
-                if ' - ' in title:
-                    parts = title.split(' - ', 1)
-                    artist = parts[0].strip()
-                    song_title = parts[1].strip()
-                else:
-                    song_title = title
-                    artist = channel.replace(' - Topic', '') if channel else 'Artista desconocido'
-                
                 # Obtener thumbnail (preferir high quality, luego medium, luego default)
                 thumbnails = snippet.get('thumbnails', {})
                 image_url = None
@@ -1573,20 +2480,13 @@ def import_youtube_playlist_authenticated(playlist_id: str) -> tuple[List[Track]
                 elif thumbnails.get('default'):
                     image_url = thumbnails['default'].get('url')
                 
-                track = Track(
-                    id=f"yt_{video_id}",
-                    title=f"{song_title} - {artist}",
-                    url="",  # Se cargará bajo demanda
-                    artist=artist,
-                    video_id=video_id,
-                    image_url=image_url
-                )
-                tracks.append(track)
+                tracks.append(build_youtube_track(video_id, title, channel, image_url))
             
             next_page_token = playlist_items.get('nextPageToken')
             if not next_page_token:
                 break
         
+        playlist_cache.put("youtube", playlist_id, version, playlist_name, tracks)
         return tracks, playlist_name
         
     except HTTPException:
@@ -1631,68 +2531,676 @@ def get_youtube_audio_url_internal(video_id: str) -> Optional[str]:
         return None
 
 
+# Margen (segundos) antes del vencimiento de una URL de googlevideo a partir del cual se vuelve a resolver
+AUDIO_URL_EXPIRY_MARGIN = int(os.getenv("AUDIO_URL_EXPIRY_MARGIN", "300"))
+# Vida asumida para URLs que no traen el parámetro expire=
+AUDIO_URL_DEFAULT_TTL = int(os.getenv("AUDIO_URL_DEFAULT_TTL", "1800"))
+AUDIO_URL_CACHE_SIZE = int(os.getenv("AUDIO_URL_CACHE_SIZE", "2000"))
+
+
+class AudioUrlCache:
+    """
+    URLs de audio ya resueltas por video_id. Cada entrada vence según el parámetro expire= de la URL,
+    y los pedidos simultáneos de un mismo video comparten una única extracción de yt-dlp.
+    """
+    def __init__(self) -> None:
+        self._entries: Dict[str, tuple[str, float]] = {}  # video_id -> (url, vence)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "shared_waits": 0, "failures": 0}
+
+    @staticmethod
+    def _expires_at(url: str) -> float:
+        try:
+            expire = float(parse_qs(urlparse(url).query)['expire'][0])
+        except (KeyError, IndexError, ValueError):
+            return time.time() + AUDIO_URL_DEFAULT_TTL
+        return expire - AUDIO_URL_EXPIRY_MARGIN
+
+    def get(self, video_id: str) -> Optional[str]:
+        """URL en caché si todavía es válida (sin resolver)"""
+        entry = self._entries.get(video_id)
+        if entry and entry[1] > time.time():
+            return entry[0]
+        return None
+
+    async def resolve(self, video_id: str) -> Optional[str]:
+        """Retorna la URL de audio de un video, resolviéndola con yt-dlp (en un thread) si hace falta"""
+        url = self.get(video_id)
+        if url:
+            self.stats["hits"] += 1
+            return url
+        task = self._inflight.get(video_id)
+        if task:
+            self.stats["shared_waits"] += 1
+        else:
+            self.stats["misses"] += 1
+            task = asyncio.ensure_future(asyncio.to_thread(get_youtube_audio_url_internal, video_id))
+            task.add_done_callback(lambda t: self._store(video_id, t))
+            self._inflight[video_id] = task
+        # shield: si este cliente se desconecta, la resolución sigue para los demás
+        return await asyncio.shield(task)
+
+    def _store(self, video_id: str, task: asyncio.Future) -> None:
+        self._inflight.pop(video_id, None)
+        url = None if task.cancelled() or task.exception() else task.result()
+        if not url:
+            self.stats["failures"] += 1
+            return
+        if len(self._entries) >= AUDIO_URL_CACHE_SIZE:
+            now = time.time()
+            self._entries = {vid: e for vid, e in self._entries.items() if e[1] > now}
+            while len(self._entries) >= AUDIO_URL_CACHE_SIZE:
+                self._entries.pop(next(iter(self._entries)))
+        self._entries[video_id] = (url, self._expires_at(url))
+
+    def invalidate(self, video_id: str) -> None:
+        """Descarta la URL de un video (por ejemplo si googlevideo respondió 403)"""
+        self._entries.pop(video_id, None)
+
+    def get_metrics(self) -> Dict:
+        return {**self.stats, "entries": len(self._entries), "inflight": len(self._inflight)}
+
+
+audio_url_cache = AudioUrlCache()
+
+
 @app.get("/youtube/audio/{video_id}")
 async def get_youtube_audio_url(video_id: str):
     """Obtiene la URL de audio de un video de YouTube bajo demanda (deprecated, usar /youtube/stream)"""
-    url = get_youtube_audio_url_internal(video_id)
+    url = await audio_url_cache.resolve(video_id)
     if url:
         return {"url": url, "video_id": video_id}
     raise HTTPException(status_code=404, detail="No se pudo obtener el audio")
 
 
+# Proxy de audio: conexiones keep-alive compartidas y chunks que crecen a medida que avanza la descarga
+AUDIO_PROXY_MAX_CONNECTIONS = int(os.getenv("AUDIO_PROXY_MAX_CONNECTIONS", "100"))
+AUDIO_PROXY_MIN_CHUNK = 16 * 1024  # Primer chunk chico para que el audio empiece rápido
+AUDIO_PROXY_MAX_CHUNK = 256 * 1024
+AUDIO_PROXY_HEADERS = {
+    'Referer': 'https://www.youtube.com/',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+}
+
+_audio_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_audio_http_client() -> httpx.AsyncClient:
+    """Cliente HTTP asíncrono compartido por todos los streams de audio"""
+    global _audio_http_client
+    if _audio_http_client is None:
+        _audio_http_client = httpx.AsyncClient(
+            headers=AUDIO_PROXY_HEADERS,
+            timeout=httpx.Timeout(30.0, connect=10.0),
+            limits=httpx.Limits(
+                max_connections=AUDIO_PROXY_MAX_CONNECTIONS,
+                max_keepalive_connections=AUDIO_PROXY_MAX_CONNECTIONS // 2,
+            ),
+            follow_redirects=True,
+        )
+    return _audio_http_client
+
+
+async def open_upstream_audio(video_id: str, range_header: str = '') -> httpx.Response:
+    """
+    Abre la descarga del audio en googlevideo (en modo streaming).
+    Si la URL en caché fue rechazada (403/410, por ejemplo vencida) se resuelve de nuevo una vez.
+    """
+    client = get_audio_http_client()
+    headers = {'Range': range_header} if range_header else {}
+    for attempt in range(2):
+        audio_url = await audio_url_cache.resolve(video_id)
+        if not audio_url:
+            raise HTTPException(status_code=404, detail="No se pudo obtener el audio")
+        upstream = await client.send(client.build_request('GET', audio_url, headers=headers), stream=True)
+        if upstream.status_code in (403, 410) and attempt == 0:
+            await upstream.aclose()
+            audio_url_cache.invalidate(video_id)
+            continue
+        if upstream.status_code >= 400:
+            await upstream.aclose()
+            raise HTTPException(status_code=500, detail=f"Error streaming audio: upstream respondió {upstream.status_code}")
+        return upstream
+    raise HTTPException(status_code=404, detail="No se pudo obtener el audio")
+
+
+async def relay_upstream_audio(upstream: httpx.Response, request: FastAPIRequest):
+    """Reenvía el cuerpo de la respuesta upstream; si el cliente se va, cancela la descarga"""
+    chunk_size = AUDIO_PROXY_MIN_CHUNK
+    buffer = bytearray()
+    try:
+        async for data in upstream.aiter_raw():
+            buffer += data
+            if len(buffer) < chunk_size:
+                continue
+            yield bytes(buffer)
+            buffer.clear()
+            chunk_size = min(chunk_size * 2, AUDIO_PROXY_MAX_CHUNK)
+            if await request.is_disconnected():
+                return
+        if buffer:
+            yield bytes(buffer)
+    finally:
+        await upstream.aclose()
+
+
+# Cache de audio en disco: cada video se descarga una sola vez y se sirve desde el archivo
+AUDIO_CACHE_DIR = Path(os.getenv("AUDIO_CACHE_DIR") or Path(__file__).parent / "audio_cache")
+AUDIO_CACHE_MAX_BYTES = int(os.getenv("AUDIO_CACHE_MAX_MB", "1024")) * 1024 * 1024
+AUDIO_FANOUT_MAX_GAP = 2 * 1024 * 1024  # Un Range que empieza más adelante que esto se pide directo a googlevideo
+AUDIO_CACHE_EXTENSIONS = {"audio/webm": ".webm", "audio/mp4": ".m4a", "audio/mpeg": ".mp3"}
+YOUTUBE_VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{6,20}$')
+
+
+# Clips cortos para los modos preview2/preview5: solo los primeros segundos del audio
+AUDIO_CLIP_MAX_SECONDS = 30
+AUDIO_CLIP_HEADER_BYTES = 64 * 1024  # Margen para los headers del contenedor (webm/m4a)
+AUDIO_CLIP_FALLBACK_BYTERATE = 24 * 1024  # ~192 kbps cuando la URL no trae la duración
+AUDIO_CLIP_CACHE_SIZE = int(os.getenv("AUDIO_CLIP_CACHE_SIZE", "512"))
+
+
+def audio_url_size_and_duration(audio_url: str) -> tuple[Optional[int], Optional[float]]:
+    """clen (bytes) y dur (segundos) que trae la URL de googlevideo, si están"""
+    params = parse_qs(urlparse(audio_url).query)
+    try:
+        clen = int(params['clen'][0])
+    except (KeyError, IndexError, ValueError):
+        clen = None
+    try:
+        dur = float(params['dur'][0])
+    except (KeyError, IndexError, ValueError):
+        dur = None
+    return clen, dur
+
+
+def audio_clip_length(total_bytes: Optional[int], duration: Optional[float], seconds: int) -> int:
+    """Bytes que cubren los primeros `seconds` segundos de un audio de `total_bytes` bytes y `duration` segundos"""
+    if not total_bytes or not duration or duration <= 0:
+        length = seconds * AUDIO_CLIP_FALLBACK_BYTERATE + AUDIO_CLIP_HEADER_BYTES
+        return min(total_bytes, length) if total_bytes else length
+    return min(total_bytes, int(total_bytes * seconds / duration) + AUDIO_CLIP_HEADER_BYTES)
+
+
+class AudioClipCache:
+    """Clips ya cortados por (video_id, segundos), en memoria con desalojo LRU"""
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[tuple[str, int], tuple[bytes, str]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0}
+
+    def get(self, video_id: str, seconds: int) -> Optional[tuple[bytes, str]]:
+        clip = self.entries.get((video_id, seconds))
+        if clip is None:
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end((video_id, seconds))
+        self.stats["hits"] += 1
+        return clip
+
+    def put(self, video_id: str, seconds: int, data: bytes, content_type: str) -> None:
+        self.entries[(video_id, seconds)] = (data, content_type)
+        self.entries.move_to_end((video_id, seconds))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def invalidate(self, video_id: str) -> None:
+        """Descarta los clips de un video (se llama cuando su audio sale del cache)"""
+        for key in [key for key in self.entries if key[0] == video_id]:
+            del self.entries[key]
+
+    def get_metrics(self) -> Dict:
+        return {
+            **self.stats,
+            "clips": len(self.entries),
+            "bytes": sum(len(data) for data, _ in self.entries.values()),
+        }
+
+
+audio_clip_cache = AudioClipCache(AUDIO_CLIP_CACHE_SIZE)
+
+
+class AudioDiskCache:
+    """Archivos de audio completos en disco con desalojo LRU por tamaño total"""
+    def __init__(self, directory: Path, max_bytes: int) -> None:
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self.total_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    def _load(self) -> None:
+        # Descartar descargas a medias de una ejecución anterior y ordenar los archivos por último uso
+        for part in self.directory.glob("*.part"):
+            part.unlink(missing_ok=True)
+        media_types = {ext: media_type for media_type, ext in AUDIO_CACHE_EXTENSIONS.items()}
+        files = sorted(
+            (f for f in self.directory.iterdir() if f.is_file() and f.suffix != ".meta"),
+            key=lambda f: f.stat().st_mtime,
+        )
+        for f in files:
+            meta = self._read_meta(f.stem)
+            self._add(f.stem, f, meta.get("content_type") or media_types.get(f.suffix, "audio/webm"), meta.get("duration"), f.stat().st_size)
+        self._unlink(self._evict())
+
+    def _meta_path(self, video_id: str) -> Path:
+        # Datos del audio que no salen del archivo (duración, para cortar clips sin volver a resolver la URL)
+        return self.directory / f"{video_id}.meta"
+
+    def _read_meta(self, video_id: str) -> Dict:
+        try:
+            with open(self._meta_path(video_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _add(self, video_id: str, path: Path, content_type: str, duration: Optional[float], size: int) -> None:
+        self.entries[video_id] = {"path": path, "size": size, "content_type": content_type, "duration": duration}
+        self.total_bytes += size
+
+    def _pop(self, video_id: str) -> List[Path]:
+        """Saca una entrada del índice y retorna sus archivos, para borrarlos donde convenga"""
+        audio_clip_cache.invalidate(video_id)
+        entry = self.entries.pop(video_id, None)
+        if not entry:
+            return []
+        self.total_bytes -= entry["size"]
+        return [entry["path"], self._meta_path(video_id)]
+
+    @staticmethod
+    def _unlink(paths: List[Path]) -> None:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    def _evict(self, keep: Optional[str] = None) -> List[Path]:
+        stale: List[Path] = []
+        while self.total_bytes > self.max_bytes and len(self.entries) > (1 if keep else 0):
+            video_id = next(iter(self.entries))
+            if video_id == keep:
+                self.entries.move_to_end(video_id)
+                continue
+            stale += self._pop(video_id)
+            self.stats["evictions"] += 1
+        return stale
+
+    def part_path(self, video_id: str) -> Path:
+        return self.directory / f"{video_id}.part"
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        entry = self.entries.get(video_id)
+        if entry is None or not entry["path"].exists():
+            if entry is not None:
+                self.remove(video_id)
+            self.stats["misses"] += 1
+            return None
+        self.entries.move_to_end(video_id)
+        self.stats["hits"] += 1
+        return entry
+
+    def contains(self, video_id: str) -> bool:
+        return video_id in self.entries
+
+    def _store(self, video_id: str, path: Path, content_type: str, duration: Optional[float], stale: List[Path]) -> None:
+        self._unlink(stale)
+        os.replace(self.part_path(video_id), path)
+        with open(self._meta_path(video_id), 'w', encoding='utf-8') as f:
+            json.dump({"content_type": content_type, "duration": duration}, f)
+
+    async def commit(self, video_id: str, content_type: str, duration: Optional[float], size: int) -> None:
+        """Mueve una descarga terminada al cache (el renombrado y los borrados corren en un hilo)"""
+        ext = AUDIO_CACHE_EXTENSIONS.get(content_type.split(";")[0].strip(), ".audio")
+        path = self.directory / f"{video_id}{ext}"
+        await asyncio.to_thread(self._store, video_id, path, content_type, duration, self._pop(video_id))
+        self._add(video_id, path, content_type, duration, size)
+        stale = self._evict(keep=video_id)
+        if stale:
+            await asyncio.to_thread(self._unlink, stale)
+
+    def remove(self, video_id: str) -> None:
+        self._unlink(self._pop(video_id))
+
+    def get_metrics(self) -> Dict:
+        return {
+            **self.stats,
+            "files": len(self.entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+
+audio_disk_cache = AudioDiskCache(AUDIO_CACHE_DIR, AUDIO_CACHE_MAX_BYTES)
+
+
+class SharedAudioFetch:
+    """Descarga de un video a un archivo parcial que cada lector consume a su ritmo mientras se completa"""
+    def __init__(self, video_id: str, on_done) -> None:
+        self.video_id = video_id
+        self.path = audio_disk_cache.part_path(video_id)
+        self.fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        self.written = 0
+        self.total: Optional[int] = None
+        self.duration: Optional[float] = None
+        self.content_type = "audio/webm"
+        self.done = False
+        self.finalized = False  # Ya salió del registro de descargas (el archivo pasó al cache o se borró)
+        self.error: Optional[str] = None
+        self.readers = 0
+        self._on_done = on_done
+        self._writing: Optional[asyncio.Future] = None
+        self._ready = asyncio.Event()
+        self._data = asyncio.Event()
+        self._task = asyncio.create_task(self._download())
+
+    def _notify(self) -> None:
+        # Despertar a los lectores que esperan más datos
+        self._data.set()
+        self._data = asyncio.Event()
+
+    async def _download(self) -> None:
+        try:
+            upstream = await open_upstream_audio(self.video_id)
+            try:
+                if upstream.status_code == 200 and 'Content-Length' in upstream.headers:
+                    self.total = int(upstream.headers['Content-Length'])
+                self.content_type = upstream.headers.get("Content-Type", self.content_type)
+                _, self.duration = audio_url_size_and_duration(str(upstream.url))
+                self._ready.set()
+                async for data in upstream.aiter_raw():
+                    # Escribir en un hilo; si cancelan la descarga la escritura en curso igual termina
+                    self._writing = asyncio.ensure_future(asyncio.to_thread(os.write, self.fd, data))
+                    await asyncio.shield(self._writing)
+                    self.written += len(data)
+                    self._notify()
+            finally:
+                await upstream.aclose()
+            if self.total is not None and self.written != self.total:
+                raise IOError(f"descarga incompleta ({self.written}/{self.total} bytes)")
+        except asyncio.CancelledError:
+            self.error = "cancelada"
+            raise
+        except Exception as e:
+            self.error = str(e.detail if isinstance(e, HTTPException) else e)
+            print(f"Error descargando audio de {self.video_id}: {self.error}")
+        finally:
+            # No marcar como terminada (y permitir cerrar el archivo) con una escritura todavía en curso
+            if self._writing is not None and not self._writing.done():
+                await asyncio.wait([self._writing])
+            self.done = True
+            self._ready.set()
+            self._notify()
+            self._on_done(self)
+
+    def add_done_callback(self, callback) -> None:
+        """Llama a `callback(fetch)` cuando la descarga termina (completa, con error o cancelada)"""
+        self._task.add_done_callback(lambda _: callback(self))
+
+    async def wait_ready(self) -> None:
+        """Espera a tener los headers de la respuesta (o un error)"""
+        await self._ready.wait()
+
+    async def wait_for(self, nbytes: int) -> None:
+        """Espera a que se hayan descargado al menos `nbytes` (o a que termine la descarga)"""
+        while self.written < nbytes and not self.done:
+            await self._data.wait()
+
+    async def read(self, start: int, end: int):
+        """Genera los bytes [start, end] del archivo a medida que se van descargando"""
+        pos = start
+        while pos <= end:
+            if pos < self.written:
+                size = min(self.written, end + 1, pos + AUDIO_PROXY_MAX_CHUNK) - pos
+                yield await asyncio.to_thread(os.pread, self.fd, size, pos)
+                pos += size
+                continue
+            if self.done:
+                return
+            await self._data.wait()
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class AudioFanout:
+    """Registro de descargas en curso por video_id; al terminar pasan al cache en disco"""
+    def __init__(self) -> None:
+        self.fetches: Dict[str, SharedAudioFetch] = {}
+        self.stats = {"upstream_fetches": 0, "shared_readers": 0, "failed_fetches": 0}
+        self._finalizing: set = set()
+
+    def acquire(self, video_id: str) -> SharedAudioFetch:
+        fetch = self.fetches.get(video_id)
+        if fetch is None:
+            fetch = SharedAudioFetch(video_id, self._finished)
+            self.fetches[video_id] = fetch
+            self.stats["upstream_fetches"] += 1
+        else:
+            self.stats["shared_readers"] += 1
+        fetch.readers += 1
+        return fetch
+
+    def release(self, fetch: SharedAudioFetch) -> None:
+        # La descarga sigue aunque no queden lectores, así el archivo completo queda en el cache
+        fetch.readers -= 1
+        if fetch.readers <= 0 and fetch.finalized:
+            fetch.close()
+
+    def _finished(self, fetch: SharedAudioFetch) -> None:
+        # Pasar el archivo al cache fuera del loop; hasta entonces los nuevos lectores se suman a esta descarga
+        task = asyncio.create_task(self._finalize(fetch))
+        self._finalizing.add(task)
+        task.add_done_callback(self._finalizing.discard)
+
+    async def _finalize(self, fetch: SharedAudioFetch) -> None:
+        try:
+            if fetch.error:
+                self.stats["failed_fetches"] += 1
+                await asyncio.to_thread(fetch.path.unlink, missing_ok=True)
+            else:
+                await audio_disk_cache.commit(fetch.video_id, fetch.content_type, fetch.duration, fetch.written)
+        except OSError as e:
+            print(f"Error guardando el audio de {fetch.video_id} en el cache: {e}")
+        finally:
+            if self.fetches.get(fetch.video_id) is fetch:
+                del self.fetches[fetch.video_id]
+            fetch.finalized = True
+            if fetch.readers <= 0:
+                fetch.close()
+
+    def get_metrics(self) -> Dict:
+        return {
+            **self.stats,
+            "active_fetches": len(self.fetches),
+            "downloading_bytes": sum(f.written for f in self.fetches.values()),
+            "readers": sum(f.readers for f in self.fetches.values()),
+        }
+
+
+audio_fanout = AudioFanout()
+
+
+# Precarga de los próximos temas de cada sala: resolver la URL y arrancar la descarga antes de que se pidan
+AUDIO_PREFETCH_CONCURRENCY = int(os.getenv("AUDIO_PREFETCH_CONCURRENCY", "4"))  # Descargas de precarga simultáneas entre todas las salas
+AUDIO_PREFETCH_WARM_BYTES = 256 * 1024  # Alcanza para los primeros segundos de audio
+
+
+class AudioPrefetcher:
+    """Resuelve y calienta el audio de los próximos temas con concurrencia global limitada"""
+    def __init__(self, concurrency: int) -> None:
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.stats = {"requested": 0, "already_cached": 0, "warmed": 0, "failed": 0, "cancelled": 0}
+
+    async def warm_all(self, video_ids: List[str]) -> None:
+        # En orden: el tema actual y el siguiente toman el semáforo antes que los demás
+        await asyncio.gather(*(self.warm(video_id) for video_id in video_ids))
+
+    async def warm(self, video_id: str) -> None:
+        self.stats["requested"] += 1
+        if audio_disk_cache.contains(video_id):
+            self.stats["already_cached"] += 1
+            return
+        try:
+            # El lugar en el semáforo es de la descarga completa, no solo de los primeros bytes:
+            # se libera cuando la descarga termina, aunque la sala cancele la precarga antes
+            await self._semaphore.acquire()
+            try:
+                if audio_disk_cache.contains(video_id):
+                    self.stats["already_cached"] += 1
+                    self._semaphore.release()
+                    return
+                if not await audio_url_cache.resolve(video_id):
+                    self.stats["failed"] += 1
+                    self._semaphore.release()
+                    return
+                fetch = audio_fanout.acquire(video_id)
+            except BaseException:
+                self._semaphore.release()
+                raise
+            fetch.add_done_callback(lambda _: self._semaphore.release())
+            try:
+                await fetch.wait_ready()
+                await fetch.wait_for(AUDIO_PREFETCH_WARM_BYTES)
+            finally:
+                audio_fanout.release(fetch)
+            self.stats["failed" if fetch.error else "warmed"] += 1
+        except asyncio.CancelledError:
+            self.stats["cancelled"] += 1
+            raise
+
+    def get_metrics(self) -> Dict:
+        return dict(self.stats)
+
+
+audio_prefetcher = AudioPrefetcher(AUDIO_PREFETCH_CONCURRENCY)
+
+
+def parse_range_header(range_header: str) -> Optional[tuple[int, Optional[int]]]:
+    """Interpreta un header Range de un solo rango ('bytes=inicio-[fin]')"""
+    match = re.fullmatch(r'\s*bytes=(\d+)-(\d*)\s*', range_header or '')
+    if not match:
+        return None
+    return int(match.group(1)), int(match.group(2)) if match.group(2) else None
+
+
+async def proxy_upstream_audio(video_id: str, request: FastAPIRequest, range_header: str) -> StreamingResponse:
+    """Proxy directo a googlevideo (para saltos lejanos o si falla la descarga compartida)"""
+    try:
+        upstream = await open_upstream_audio(video_id, range_header)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=500, detail=f"Error streaming audio: {str(e)}")
+    
+    response_headers = {"Accept-Ranges": "bytes"}
+    # Copiar los headers de respuesta relevantes
+    for header in ('Content-Range', 'Content-Length'):
+        if header in upstream.headers:
+            response_headers[header] = upstream.headers[header]
+    
+    return StreamingResponse(
+        relay_upstream_audio(upstream, request),
+        status_code=upstream.status_code,
+        media_type=upstream.headers.get("Content-Type", "audio/webm"),
+        headers=response_headers
+    )
+
+
 @app.get("/youtube/stream/{video_id}")
 async def stream_youtube_audio(video_id: str, request: FastAPIRequest):
     """Stream del audio de YouTube a través del backend (evita problemas de CORS y 403)"""
-    audio_url = get_youtube_audio_url_internal(video_id)
+    if not YOUTUBE_VIDEO_ID_RE.match(video_id):
+        raise HTTPException(status_code=400, detail="video_id inválido")
+    
+    # Si el audio ya está completo en disco se sirve directo del archivo (sendfile, con soporte de Range)
+    cached = audio_disk_cache.get(video_id)
+    if cached:
+        return FileResponse(cached["path"], media_type=cached["content_type"])
     
-    if not audio_url:
-        raise HTTPException(status_code=404, detail="No se pudo obtener el audio")
+    # Obtener el header Range del cliente si existe
+    range_header = request.headers.get('Range', '')
+    requested = parse_range_header(range_header)
+    if range_header and not requested:
+        return await proxy_upstream_audio(video_id, request, range_header)
     
+    # Leer de la descarga compartida del video (se inicia si nadie la está usando)
+    fetch = audio_fanout.acquire(video_id)
     try:
-        # Obtener el header Range del cliente si existe
-        range_header = request.headers.get('Range', '')
-        
-        headers = {
-            'Referer': 'https://www.youtube.com/',
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-        }
-        
-        if range_header:
-            headers['Range'] = range_header
-        
-        response = requests.get(audio_url, headers=headers, stream=True, timeout=30)
-        response.raise_for_status()
-        
-        def generate():
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    yield chunk
-        
-        response_headers = {
-            "Accept-Ranges": "bytes",
-            "Content-Type": response.headers.get("Content-Type", "audio/webm"),
-        }
-        
-        # Si hay Range, copiar los headers de respuesta relevantes
-        if range_header:
-            if 'Content-Range' in response.headers:
-                response_headers['Content-Range'] = response.headers['Content-Range']
-            if 'Content-Length' in response.headers:
-                response_headers['Content-Length'] = response.headers['Content-Length']
+        await fetch.wait_ready()
+    except BaseException:
+        audio_fanout.release(fetch)
+        raise
+    start, end = requested if requested else (0, None)
+    far_ahead = start > fetch.written + AUDIO_FANOUT_MAX_GAP and not fetch.done
+    if fetch.total is None or far_ahead:
+        # Liberar antes del proxy directo: si este falla no hay que volver a soltar la descarga compartida
+        audio_fanout.release(fetch)
+        return await proxy_upstream_audio(video_id, request, range_header)
+    
+    if start >= fetch.total:
+        audio_fanout.release(fetch)
+        raise HTTPException(status_code=416, detail="Rango no disponible", headers={"Content-Range": f"bytes */{fetch.total}"})
+    end = fetch.total - 1 if end is None else min(end, fetch.total - 1)
+    
+    async def generate():
+        try:
+            async for chunk in fetch.read(start, end):
+                yield chunk
+        finally:
+            audio_fanout.release(fetch)
+    
+    response_headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(end - start + 1),
+    }
+    if requested:
+        response_headers["Content-Range"] = f"bytes {start}-{end}/{fetch.total}"
+    
+    return StreamingResponse(
+        generate(),
+        status_code=206 if requested else 200,
+        media_type=fetch.content_type,
+        headers=response_headers
+    )
+
+
+def _read_file_prefix(path: Path, length: int) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read(length)
+
+
+@app.get("/youtube/clip/{video_id}")
+async def get_youtube_clip(video_id: str, seconds: int = 5):
+    """Primeros `seconds` segundos del audio (para los modos preview2/preview5, sin bajar el tema completo)"""
+    if not YOUTUBE_VIDEO_ID_RE.match(video_id):
+        raise HTTPException(status_code=400, detail="video_id inválido")
+    if not 1 <= seconds <= AUDIO_CLIP_MAX_SECONDS:
+        raise HTTPException(status_code=400, detail=f"seconds debe estar entre 1 y {AUDIO_CLIP_MAX_SECONDS}")
+    
+    clip = audio_clip_cache.get(video_id, seconds)
+    if clip is None:
+        # Cortar del archivo en disco si ya está (sin tocar la red); si no, de la descarga compartida apenas lleguen esos bytes
+        source = audio_disk_cache.get(video_id)
+        if source:
+            length = audio_clip_length(source["size"], source["duration"], seconds)
+            data = await asyncio.to_thread(_read_file_prefix, source["path"], length)
+            content_type = source["content_type"]
         else:
-            if 'Content-Length' in response.headers:
-                response_headers['Content-Length'] = response.headers['Content-Length']
-        
-        status_code = 206 if range_header else 200
-        
-        return StreamingResponse(
-            generate(),
-            status_code=status_code,
-            media_type="audio/webm",
-            headers=response_headers
-        )
-    except requests.RequestException as e:
-        raise HTTPException(status_code=500, detail=f"Error streaming audio: {str(e)}")
+            audio_url = await audio_url_cache.resolve(video_id)
+            if not audio_url:
+                raise HTTPException(status_code=404, detail="No se pudo obtener el audio del video")
+            length = audio_clip_length(*audio_url_size_and_duration(audio_url), seconds)
+            fetch = audio_fanout.acquire(video_id)
+            try:
+                await fetch.wait_ready()
+                data = b"".join([chunk async for chunk in fetch.read(0, length - 1)])
+                content_type = fetch.content_type
+            finally:
+                audio_fanout.release(fetch)
+            if fetch.error and len(data) < length:
+                raise HTTPException(status_code=500, detail=f"Error obteniendo el audio: {fetch.error}")
+        clip = (data, content_type)
+        audio_clip_cache.put(video_id, seconds, data, content_type)
+    
+    data, content_type = clip
+    return Response(content=data, media_type=content_type, headers={"Cache-Control": "public, max-age=3600"})
 
 
 @app.post("/playlist/import-authenticated")
@@ -1719,25 +3227,25 @@ async def import_playlist_authenticated(data: PlaylistImport):
         target_room = room  # Usar sala por defecto para compatibilidad
         TRACKS = []  # Solo actualizar TRACKS global si no hay sala específica
     
-    tracks, playlist_name = import_youtube_playlist_authenticated(playlist_id)
+    if not await asyncio.to_thread(get_youtube_service):
+        raise HTTPException(status_code=401, detail="No autenticado con YouTube. Inicia sesión primero.")
     
-    if not tracks:
-        raise HTTPException(status_code=400, detail="La playlist está vacía o no tiene videos disponibles")
+    # Si la misma playlist ya se está importando (desde esta u otra sala) se espera ese mismo job
+    job = import_jobs.start(data.playlist_url.strip(), "youtube", room_name_param, target_room)
+    # wait y no shield: no cancela el job si este cliente se va, ni falla si el job se canceló antes de arrancar
+    await asyncio.wait([job.task])
+    if job.status != "done":
+        raise HTTPException(status_code=job.error_status or 500, detail=job.error or "Importación cancelada")
     
+    tracks = [Track(**t) for t in job.result["tracks"]]
     if not room_name_param:
         TRACKS = tracks
     
-    await target_room.update_tracks(tracks)
-    if room_name_param:
-        await manager.broadcast(build_state_message(target_room), room_name_param)
-    else:
-        await manager.broadcast(build_state_message(target_room))
-    
     return {
         "success": True,
-        "message": f"Playlist '{playlist_name}' importada. {len(tracks)} canciones cargadas.",
-        "tracks": [t.model_dump() for t in tracks],
-        "playlist_name": playlist_name,
+        "message": f"Playlist '{job.result['playlist_name']}' importada. {len(tracks)} canciones cargadas.",
+        "tracks": job.result["tracks"],
+        "playlist_name": job.result["playlist_name"],
         "total_tracks": len(tracks),
         "requires_audio_fetch": True  # Indica que las URLs se cargan bajo demanda
     }
@@ -1785,35 +3293,70 @@ async def check_room(room_name: str):
     return {"exists": exists, "room_name": room_name}
 
 
-def verify_admin_password(password: str) -> bool:
+# Validez de un token de admin emitido por /admin/auth (segundos)
+ADMIN_TOKEN_TTL = int(os.getenv("ADMIN_TOKEN_TTL", str(60 * 60)))
+# Tiempo que se recuerda una contraseña de admin ya verificada (segundos)
+ADMIN_CREDENTIAL_CACHE_TTL = int(os.getenv("ADMIN_CREDENTIAL_CACHE_TTL", "300"))
+# HMAC de la contraseña verificada -> vencimiento (nunca se guarda la contraseña en claro)
+admin_credential_cache: Dict[str, float] = {}
+
+
+async def verify_admin_password(password: str) -> bool:
     """Verifica la contraseña de administrador"""
     # Si hay hash configurado, usar verificación segura con bcrypt
     if ADMIN_PASSWORD_HASH:
-        try:
-            return bcrypt.checkpw(password.encode('utf-8'), ADMIN_PASSWORD_HASH.encode('utf-8'))
-        except:
+        cache_key = hmac.new(SESSION_SECRET.encode('utf-8'), password.encode('utf-8'), hashlib.sha256).hexdigest()
+        now = time.time()
+        if admin_credential_cache.get(cache_key, 0) > now:
+            return True
+        if not await check_password(password, ADMIN_PASSWORD_HASH):
             return False
+        # Descartar entradas vencidas antes de agregar la nueva
+        for key in [k for k, expires_at in admin_credential_cache.items() if expires_at <= now]:
+            del admin_credential_cache[key]
+        admin_credential_cache[cache_key] = now + ADMIN_CREDENTIAL_CACHE_TTL
+        return True
     # Si no hay hash configurado, comparar directamente (solo desarrollo)
     # En producción siempre debe usarse ADMIN_PASSWORD_HASH
     return password == ADMIN_PASSWORD_PLAIN
 
 
+async def verify_admin_credentials(password: Optional[str], token: Optional[str]) -> bool:
+    """Acepta un token de admin válido (una verificación HMAC) o, si no hay token, la contraseña"""
+    if token and verify_token(token, 'admin'):
+        return True
+    if password:
+        return await verify_admin_password(password)
+    return False
+
+
+def issue_admin_token() -> str:
+    now = time.time()
+    return sign_token({'kind': 'admin', 'iat': now, 'exp': now + ADMIN_TOKEN_TTL})
+
+
 @app.post("/admin/auth")
 async def admin_auth(data: AdminAuthRequest):
-    """Autentica al administrador con contraseña"""
-    if verify_admin_password(data.password):
-        return {"authenticated": True, "message": "Autenticación exitosa"}
+    """Autentica al administrador con contraseña y emite un token de sesión"""
+    if await verify_admin_password(data.password):
+        return {
+            "authenticated": True,
+            "message": "Autenticación exitosa",
+            "token": issue_admin_token(),
+            "expires_in": ADMIN_TOKEN_TTL,
+        }
     raise HTTPException(status_code=401, detail="Contraseña incorrecta")
 
 
 class AdminPasswordRequest(BaseModel):
-    admin_password: str
+    admin_password: Optional[str] = None
+    admin_token: Optional[str] = None
 
 
 @app.post("/admin/rooms")
 async def admin_list_rooms(data: AdminPasswordRequest):
-    """Lista todas las salas activas (requiere contraseña de admin)"""
-    if not verify_admin_password(data.admin_password):
+    """Lista todas las salas activas (requiere contraseña o token de admin)"""
+    if not await verify_admin_credentials(data.admin_password, data.admin_token):
         raise HTTPException(status_code=401, detail="Contraseña de administrador incorrecta")
     
     rooms = await room_manager.list_rooms()
@@ -1822,16 +3365,15 @@ async def admin_list_rooms(data: AdminPasswordRequest):
 
 @app.post("/admin/rooms/close")
 async def admin_close_room(data: CloseRoomRequest):
-    """Cierra y elimina una sala (requiere contraseña de admin)"""
-    if not verify_admin_password(data.admin_password):
+    """Cierra y elimina una sala (requiere contraseña o token de admin)"""
+    if not await verify_admin_credentials(data.admin_password, data.admin_token):
         raise HTTPException(status_code=401, detail="Contraseña de administrador incorrecta")
     
     # Normalizar el nombre de la sala
     room_name_clean = data.room_name.strip().lower()
     
     # Debug: Listar todas las salas disponibles
-    async with room_manager._lock:
-        available_rooms = list(room_manager.rooms.keys())
+    available_rooms = list(room_manager.rooms.keys())
     
     # Verificar que la sala existe y obtener la instancia
     room_instance = await room_manager.get_room(room_name_clean)
@@ -1860,8 +3402,8 @@ async def admin_close_room(data: CloseRoomRequest):
 
 @app.post("/admin/rooms/{room_name}")
 async def admin_get_room_info(room_name: str, data: AdminPasswordRequest):
-    """Obtiene información detallada de una sala (requiere contraseña de admin)"""
-    if not verify_admin_password(data.admin_password):
+    """Obtiene información detallada de una sala (requiere contraseña o token de admin)"""
+    if not await verify_admin_credentials(data.admin_password, data.admin_token):
         raise HTTPException(status_code=401, detail="Contraseña de administrador incorrecta")
     
     # Normalizar el nombre de la sala
@@ -1870,8 +3412,7 @@ async def admin_get_room_info(room_name: str, data: AdminPasswordRequest):
     room_info = await room_manager.get_room_info(room_name_clean)
     if not room_info:
         # Listar todas las salas disponibles para debug
-        async with room_manager._lock:
-            available_rooms = list(room_manager.rooms.keys())
+        available_rooms = list(room_manager.rooms.keys())
         raise HTTPException(
             status_code=404, 
             detail=f"Sala no encontrada. Sala buscada: '{room_name_clean}'. Salas disponibles: {available_rooms}"
@@ -1882,8 +3423,8 @@ async def admin_get_room_info(room_name: str, data: AdminPasswordRequest):
 
 @app.post("/admin/players/ban")
 async def admin_ban_player(data: BanPlayerRequest):
-    """Banea/expulsa a un jugador de una sala (requiere contraseña de admin)"""
-    if not verify_admin_password(data.admin_password):
+    """Banea/expulsa a un jugador de una sala (requiere contraseña o token de admin)"""
+    if not await verify_admin_credentials(data.admin_password, data.admin_token):
         raise HTTPException(status_code=401, detail="Contraseña de administrador incorrecta")
     
     # Normalizar el nombre de la sala
@@ -1898,7 +3439,9 @@ async def admin_ban_player(data: BanPlayerRequest):
     if not player:
         raise HTTPException(status_code=404, detail="Jugador no encontrado en la sala")
     
-    await room_instance.remove_player(data.player_id)
+    patch = await room_instance.remove_player(data.player_id)
+    # Invalidar los tickets del jugador para que no pueda reconectarse sin contraseña
+    room_instance.ticket_revocations[data.player_id] = time.time()
     
     # Desconectar el WebSocket del jugador (ya está normalizado arriba)
     if room_name_clean in manager.rooms:
@@ -1910,16 +3453,56 @@ async def admin_ban_player(data: BanPlayerRequest):
                     pass
                 break
     
-    # Notificar a los demás en la sala
-    await manager.broadcast(
-        {"type": "player_banned", "payload": {"playerId": data.player_id, "playerName": player.name}},
-        room_name_clean
-    )
-    await manager.broadcast(build_state_message(room_instance), room_name_clean)
+    # Notificar a los demás en la sala (aviso y patch en un solo frame)
+    banned = {"type": "player_banned", "payload": {"playerId": data.player_id, "playerName": player.name}}
+    await manager.broadcast(build_events_message([banned, patch] if patch else [banned]), room_name_clean)
     
     return {"success": True, "message": f"Jugador '{player.name}' expulsado de la sala"}
 
 
+@app.post("/admin/metrics")
+async def admin_metrics(data: AdminPasswordRequest):
+    """Métricas internas del servidor (requiere contraseña o token de admin)"""
+    if not await verify_admin_credentials(data.admin_password, data.admin_token):
+        raise HTTPException(status_code=401, detail="Contraseña de administrador incorrecta")
+    
+    return {
+        "websockets": manager.get_metrics(),
+        "password_checks": {**password_stats, "workers": PASSWORD_HASH_WORKERS},
+        "audio_urls": audio_url_cache.get_metrics(),
+        "audio_fanout": audio_fanout.get_metrics(),
+        "audio_cache": audio_disk_cache.get_metrics(),
+        "audio_clips": audio_clip_cache.get_metrics(),
+        "audio_prefetch": audio_prefetcher.get_metrics(),
+        "youtube_index": youtube_match_index.get_metrics(),
+        "playlist_cache": playlist_cache.get_metrics(),
+        "import_jobs": import_jobs.get_metrics(),
+        "locks": {
+            "room_manager": room_manager._lock.get_metrics(),
+            "rooms": {name: data['room']._lock.get_metrics() for name, data in room_manager.rooms.items()},
+        },
+        "scores": {
+            "default": score_writer.get_metrics(),
+            "rooms": {name: data['room'].scores.get_metrics() for name, data in room_manager.rooms.items()},
+        },
+    }
+
+
+@app.on_event("shutdown")
+async def flush_pending_scores():
+    """Escribe los scores pendientes antes de apagar el servidor"""
+    await score_writer.flush()
+    for room_data in list(room_manager.rooms.values()):
+        await room_data['room'].scores.flush()
+
+
+@app.on_event("shutdown")
+async def close_audio_http_client():
+    """Cierra las conexiones del proxy de audio"""
+    if _audio_http_client is not None:
+        await _audio_http_client.aclose()
+
+
 @app.get("/")
 async def root():
     return {"message": "Music buzzer backend activo", "tracks": [t.model_dump() for t in TRACKS]}
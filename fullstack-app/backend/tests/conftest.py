@@ -0,0 +1,21 @@
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Todo lo que main.py guarda en disco va a un directorio temporal, nunca junto al código.
+# Se configura antes de importar main: los stores se crean al importar el módulo.
+_store_dir = Path(tempfile.mkdtemp(prefix="una_nota_tests_"))
+os.environ.update({
+    "AUDIO_CACHE_DIR": str(_store_dir / "audio_cache"),
+    "SCORES_DB_FILE": str(_store_dir / "scores.db"),
+    "SCORES_DIR": str(_store_dir / "scores"),
+    "YOUTUBE_INDEX_DB_FILE": str(_store_dir / "youtube_index.db"),
+    "PLAYLIST_CACHE_DIR": str(_store_dir / "playlist_cache"),
+})
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_store_dir, ignore_errors=True)
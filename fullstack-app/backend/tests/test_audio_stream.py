@@ -0,0 +1,132 @@
+import asyncio
+import os
+
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_stream_falls_back_to_proxy_and_releases_shared_fetch_once(monkeypatch):
+    """Si falla la descarga compartida y después el proxy directo, el archivo parcial se cierra una sola vez"""
+    async def unresolvable(video_id):
+        return None
+
+    monkeypatch.setattr(main.audio_url_cache, "resolve", unresolvable)
+
+    fetches = []
+    original_acquire = main.audio_fanout.acquire
+
+    def tracking_acquire(video_id):
+        fetch = original_acquire(video_id)
+        fetches.append(fetch)
+        return fetch
+
+    monkeypatch.setattr(main.audio_fanout, "acquire", tracking_acquire)
+
+    closed_fds = []
+    real_close = os.close
+
+    def tracking_close(fd):
+        closed_fds.append(fd)
+        real_close(fd)
+
+    monkeypatch.setattr(main.os, "close", tracking_close)
+
+    response = TestClient(main.app).get("/youtube/stream/abcdefghijk")
+
+    assert response.status_code == 404
+    assert len(fetches) == 1
+    assert closed_fds.count(fetches[0].fd) == 1
+    assert fetches[0].readers == 0
+    assert "abcdefghijk" not in main.audio_fanout.fetches
+
+
+def test_clip_of_disk_cached_audio_does_not_resolve_url(monkeypatch):
+    """El clip de un audio ya en disco se corta con la duración guardada, sin volver a resolver la URL"""
+    async def must_not_resolve(video_id):
+        raise AssertionError("no debería resolver la URL de un audio en disco")
+
+    monkeypatch.setattr(main.audio_url_cache, "resolve", must_not_resolve)
+
+    video_id = "cachedclip0"
+    header = main.AUDIO_CLIP_HEADER_BYTES
+    body = bytes(range(256)) * 400
+    with open(main.audio_disk_cache.part_path(video_id), "wb") as f:
+        f.write(body)
+    asyncio.run(main.audio_disk_cache.commit(video_id, "audio/webm", 20.0, len(body)))
+    try:
+        response = TestClient(main.app).get(f"/youtube/clip/{video_id}?seconds=5")
+
+        assert response.status_code == 200
+        assert response.content == body[:min(len(body), len(body) * 5 // 20 + header)]
+
+        # La duración sobrevive a un reinicio gracias al archivo .meta
+        reloaded = main.AudioDiskCache(main.audio_disk_cache.directory, main.AUDIO_CACHE_MAX_BYTES)
+        assert reloaded.get(video_id)["duration"] == 20.0
+    finally:
+        main.audio_clip_cache.invalidate(video_id)
+        main.audio_disk_cache.remove(video_id)
+
+
+def test_prefetch_holds_its_slot_until_the_download_finishes(monkeypatch):
+    """Con un solo lugar de precarga, el segundo tema no empieza a bajar hasta que termina el primero aunque se cancele la precarga"""
+    async def resolved(video_id):
+        return f"https://example.invalid/{video_id}?dur=10"
+
+    monkeypatch.setattr(main.audio_url_cache, "resolve", resolved)
+
+    opened = []
+    finish = {}
+
+    class FakeUpstream:
+        status_code = 200
+
+        def __init__(self, video_id):
+            self.video_id = video_id
+            self.url = f"https://example.invalid/{video_id}?dur=10"
+            self.headers = {"Content-Type": "audio/webm"}
+
+        async def aiter_raw(self):
+            yield b"x" * main.AUDIO_PREFETCH_WARM_BYTES
+            await finish[self.video_id].wait()
+
+        async def aclose(self):
+            pass
+
+    async def fake_open(video_id, range_header=''):
+        opened.append(video_id)
+        return FakeUpstream(video_id)
+
+    monkeypatch.setattr(main, "open_upstream_audio", fake_open)
+
+    async def scenario():
+        prefetcher = main.AudioPrefetcher(1)
+        finish.update({"prefetchaaa": asyncio.Event(), "prefetchbbb": asyncio.Event()})
+
+        await prefetcher.warm("prefetchaaa")
+        second = asyncio.create_task(prefetcher.warm("prefetchbbb"))
+        await asyncio.sleep(0.05)
+        assert opened == ["prefetchaaa"]
+
+        # Cancelar la precarga no libera el lugar mientras la descarga siga en curso
+        second.cancel()
+        third = asyncio.create_task(prefetcher.warm("prefetchbbb"))
+        await asyncio.sleep(0.05)
+        assert opened == ["prefetchaaa"]
+
+        finish["prefetchaaa"].set()
+        await asyncio.wait_for(third, 1)
+        assert opened == ["prefetchaaa", "prefetchbbb"]
+        downloaded = asyncio.get_running_loop().create_future()
+        main.audio_fanout.fetches["prefetchbbb"].add_done_callback(downloaded.set_result)
+        finish["prefetchbbb"].set()
+        await asyncio.wait_for(downloaded, 1)
+        while main.audio_fanout.fetches:
+            await asyncio.sleep(0.01)  # Esperar a que ambos archivos pasen al cache en disco
+
+    try:
+        asyncio.run(scenario())
+        assert main.audio_disk_cache.contains("prefetchaaa")
+    finally:
+        main.audio_disk_cache.remove("prefetchaaa")
+        main.audio_disk_cache.remove("prefetchbbb")
@@ -0,0 +1,31 @@
+import asyncio
+
+import main
+
+
+def test_job_cancelled_before_it_starts_is_not_reused(monkeypatch):
+    """Un job cancelado antes de su primer paso queda cancelado y la misma playlist se puede volver a importar"""
+    async def fake_import(playlist_url, source, job):
+        return {"message": "ok", "playlist_name": "Lista", "tracks": [], "tracks_skipped": 0}
+
+    monkeypatch.setattr(main, "run_playlist_import", fake_import)
+    url = "https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M"
+
+    async def scenario():
+        jobs = main.ImportJobManager()
+        target = main.Room([])
+
+        first = jobs.start(url, "spotify", None, target)
+        first.task.cancel()
+        await asyncio.wait([first.task])
+
+        assert first.status == "cancelled"
+        assert first.finished_at is not None
+        assert jobs.get_metrics()["running"] == 0
+
+        second = jobs.start(url, "spotify", None, target)
+        assert second is not first
+        await asyncio.wait([second.task])
+        assert second.status == "done"
+
+    asyncio.run(scenario())
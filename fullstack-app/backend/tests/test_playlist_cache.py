@@ -0,0 +1,73 @@
+import main
+
+
+def fake_request(response):
+    return type("Request", (), {"execute": lambda self: response})()
+
+
+class FakeYoutube:
+    """Cliente de la API de YouTube con una playlist fija que cuenta los pedidos hechos"""
+    def __init__(self, video_ids, etag="etag-1"):
+        self.video_ids = video_ids
+        self.etag = etag
+        self.calls = 0
+
+    def playlists(self):
+        youtube = self
+
+        class Playlists:
+            def list(self, part, id):
+                youtube.calls += 1
+                return fake_request({"items": [{
+                    "etag": youtube.etag,
+                    "snippet": {"title": "Mi playlist"},
+                    "contentDetails": {"itemCount": len(youtube.video_ids)},
+                }]})
+
+        return Playlists()
+
+    def playlistItems(self):
+        youtube = self
+
+        class PlaylistItems:
+            def list(self, part, playlistId, maxResults, pageToken=None):
+                youtube.calls += 1
+                start = int(pageToken or 0)
+                page = youtube.video_ids[start:start + maxResults]
+                response = {"items": [
+                    {"snippet": {"resourceId": {"videoId": video_id}, "title": f"Tema {video_id}"}}
+                    for video_id in page
+                ]}
+                if start + maxResults < len(youtube.video_ids):
+                    response["nextPageToken"] = str(start + maxResults)
+                return fake_request(response)
+
+        return PlaylistItems()
+
+
+def test_youtube_cache_hit_costs_one_api_call(monkeypatch, tmp_path):
+    """Una playlist ya importada se valida con un único pedido; al vencer se vuelve a importar completa"""
+    youtube = FakeYoutube([f"video{i:06d}" for i in range(120)])
+    monkeypatch.setattr(main, "playlist_cache", main.PlaylistCache(tmp_path))
+
+    tracks, name = main.import_youtube_playlist_authenticated(youtube, "PL123")
+    assert (len(tracks), name) == (120, "Mi playlist")
+    assert youtube.calls == 1 + 3
+
+    youtube.calls = 0
+    tracks, _ = main.import_youtube_playlist_authenticated(youtube, "PL123")
+    assert len(tracks) == 120
+    assert youtube.calls == 1
+
+    # Una baja cambia la cantidad de videos y con eso la versión
+    youtube.video_ids = youtube.video_ids[:-1]
+    youtube.calls = 0
+    tracks, _ = main.import_youtube_playlist_authenticated(youtube, "PL123")
+    assert len(tracks) == 119
+    assert youtube.calls == 1 + 3
+
+    # Pasado el máximo de validez se importa de nuevo aunque la versión sea la misma
+    monkeypatch.setattr(main, "PLAYLIST_CACHE_YOUTUBE_MAX_AGE", -1)
+    youtube.calls = 0
+    main.import_youtube_playlist_authenticated(youtube, "PL123")
+    assert youtube.calls == 1 + 3
@@ -0,0 +1,24 @@
+import asyncio
+
+import main
+
+
+def test_mark_dirty_after_close_is_dropped(monkeypatch, tmp_path):
+    """Un cambio de score en una sala ya cerrada no reinicia el flush sobre la base cerrada"""
+    monkeypatch.setattr(main, "SCORES_FLUSH_INTERVAL", 0.01)
+
+    async def scenario():
+        writer = main.ScoreWriter(main.ScoreStore(tmp_path / "scores.db"))
+        writer.mark_dirty(main.Player(id="p1", name="Ana", score=1))
+        await writer.close()
+        assert writer.store.path.exists()
+
+        writer.mark_dirty(main.Player(id="p1", name="Ana", score=2))
+        await asyncio.sleep(0.05)
+        return writer
+
+    writer = asyncio.run(scenario())
+    assert writer.stats["records_written"] == 1
+    assert writer.stats["flush_errors"] == 0
+    assert writer.stats["dropped_after_close"] == 1
+    assert writer._flush_task is None or writer._flush_task.done()
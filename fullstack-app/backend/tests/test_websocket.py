@@ -0,0 +1,28 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_bad_frame_releases_the_player_name():
+    """Un frame inválido cierra la conexión y libera el nombre del jugador para que pueda volver a entrar"""
+    client = TestClient(main.app)
+    assert client.post("/rooms/create", json={"room_name": "sala-frame", "password": "clave"}).status_code == 200
+    join = {"type": "join", "name": "Ana", "role": "player", "room_name": "sala-frame", "password": "clave"}
+
+    with pytest.raises(Exception):
+        with client.websocket_connect("/ws/sala") as ws:
+            ws.send_json(join)
+            while ws.receive_json().get("type") != "events":
+                pass
+            ws.send_text("{no es json")
+            ws.receive_json()
+
+    assert "sala-frame" not in main.manager.rooms
+
+    with client.websocket_connect("/ws/sala") as ws:
+        ws.send_json(join)
+        message = ws.receive_json()
+        while message.get("type") not in ("events", "join_error"):
+            message = ws.receive_json()
+        assert message["type"] == "events"
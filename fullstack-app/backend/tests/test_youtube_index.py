@@ -0,0 +1,20 @@
+import main
+
+SPOTIFY_TRACK = {"id": "abc123", "name": "Despacito", "artists": [{"name": "Luis Fonsi"}], "duration_ms": 229000}
+
+
+def test_transient_search_error_is_not_cached_as_failure(monkeypatch, tmp_path):
+    """Un bloqueo o timeout de YouTube no debe dejar la canción en el caché negativo"""
+    index = main.YoutubeMatchIndex(tmp_path / "index.db")
+    monkeypatch.setattr(main, "youtube_match_index", index)
+
+    def blocked(*args):
+        raise main.YoutubeSearchError("Sign in to confirm you're not a bot")
+
+    monkeypatch.setattr(main, "search_youtube_video_id", blocked)
+    assert main.resolve_spotify_track_video_id(SPOTIFY_TRACK) is None
+    assert index.lookup(main.spotify_track_keys(SPOTIFY_TRACK)) == (None, False)
+
+    monkeypatch.setattr(main, "search_youtube_video_id", lambda *args: None)
+    assert main.resolve_spotify_track_video_id(SPOTIFY_TRACK) is None
+    assert index.lookup(main.spotify_track_keys(SPOTIFY_TRACK)) == (None, True)
@@ -25,7 +25,8 @@ export function Admin() {
   const [rooms, setRooms] = useState<RoomInfo[]>([]);
   const [selectedRoom, setSelectedRoom] = useState<RoomDetail | null>(null);
   const [loading, setLoading] = useState(false);
-  const [adminPassword, setAdminPassword] = useState('');
+  // Token de sesión emitido por /admin/auth (evita enviar la contraseña en cada consulta)
+  const [adminToken, setAdminToken] = useState('');
 
   const handleAuth = async (e: React.FormEvent) => {
     e.preventDefault();
@@ -42,9 +43,9 @@ export function Admin() {
       });
 
       if (response.ok) {
+        const data = await response.json();
+        setAdminToken(data.token);
         setAuthenticated(true);
-        setAdminPassword(password);
-        loadRooms();
       } else {
         setAuthError('Contraseña incorrecta');
       }
@@ -62,11 +63,15 @@ export function Admin() {
         headers: {
           'Content-Type': 'application/json',
         },
-        body: JSON.stringify({ admin_password: adminPassword }),
+        body: JSON.stringify({ admin_token: adminToken }),
       });
       if (response.ok) {
         const data = await response.json();
         setRooms(data.rooms || []);
+      } else if (response.status === 401) {
+        // Token vencido: pedir la contraseña de nuevo
+        setAuthenticated(false);
+        setAdminToken('');
       }
     } catch (error) {
       console.error('Error cargando salas:', error);
@@ -82,7 +87,7 @@ export function Admin() {
           headers: {
             'Content-Type': 'application/json',
           },
-          body: JSON.stringify({ admin_password: adminPassword }),
+          body: JSON.stringify({ admin_token: adminToken }),
         }
       );
       if (response.ok) {
@@ -107,7 +112,7 @@ export function Admin() {
         },
         body: JSON.stringify({
           room_name: roomName,
-          admin_password: adminPassword,
+          admin_token: adminToken,
         }),
       });
 
@@ -141,7 +146,7 @@ export function Admin() {
         body: JSON.stringify({
           room_name: roomName,
           player_id: playerId,
-          admin_password: adminPassword,
+          admin_token: adminToken,
         }),
       });
 
@@ -164,7 +169,7 @@ export function Admin() {
       const interval = setInterval(loadRooms, 5000); // Actualizar cada 5 segundos
       return () => clearInterval(interval);
     }
-  }, [authenticated, adminPassword]);
+  }, [authenticated, adminToken]);
 
   const handleBackToHome = () => {
     window.location.href = '/';
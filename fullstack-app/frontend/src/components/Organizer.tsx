@@ -11,7 +11,7 @@ interface OrganizerProps {
 }
 
 export function Organizer({ roomName, password }: OrganizerProps) {
-  const { connected, gameState, connect, control, setWinner, adjustScore, nextTrack, selectTrack, removePlayer } = useGameSocket();
+  const { connected, gameState, importProgress, connect, control, setWinner, adjustScore, nextTrack, selectTrack, removePlayer } = useGameSocket();
   const [name, setName] = useState('Organizador');
   const [joined, setJoined] = useState(false);
   const [playlistUrl, setPlaylistUrl] = useState('');
@@ -19,6 +19,7 @@ export function Organizer({ roomName, password }: OrganizerProps) {
   const [importing, setImporting] = useState(false);
   const [importError, setImportError] = useState<string | null>(null);
   const [importSuccess, setImportSuccess] = useState<string | null>(null);
+  const [importJobId, setImportJobId] = useState<string | null>(null);
   const [currentPage, setCurrentPage] = useState(1);
   const [youtubeAuthenticated, setYoutubeAuthenticated] = useState(false);
   const [checkingAuth, setCheckingAuth] = useState(true);
@@ -95,9 +96,13 @@ export function Organizer({ roomName, password }: OrganizerProps) {
 
     const playAudio = async () => {
       let audioUrl = currentTrack.url;
+      const previewSeconds = gameState.status === 'preview2' ? 2 : gameState.status === 'preview5' ? 5 : null;
 
-      // Si no hay URL pero hay video_id, cargar bajo demanda
-      if (!audioUrl && currentTrack.video_id) {
+      // Los previews de YouTube usan un clip corto del servidor en vez del audio completo
+      if (!audioUrl && currentTrack.video_id && previewSeconds) {
+        audioUrl = getClipUrl(currentTrack.video_id, previewSeconds);
+      } else if (!audioUrl && currentTrack.video_id) {
+        // Si no hay URL pero hay video_id, cargar bajo demanda
         const cachedUrl = audioCache[currentTrack.video_id];
         if (cachedUrl) {
           audioUrl = cachedUrl;
@@ -154,6 +159,46 @@ export function Organizer({ roomName, password }: OrganizerProps) {
     }
   }, [gameState?.status, gameState?.current_track_id, gameState?.tracks, audioCache]);
 
+  const showImportResult = (data: any) => {
+    let successMessage = `Playlist "${data.playlist_name}" importada exitosamente! ${data.total_tracks || data.tracks_count} canciones cargadas.`;
+    if (data.tracks_skipped && data.tracks_skipped > 0) {
+      successMessage += ` (${data.tracks_skipped} canciones omitidas)`;
+    }
+    if (data.requires_audio_fetch) {
+      successMessage += ' (Audio se cargará al reproducir)';
+    }
+    setImportSuccess(successMessage);
+    setPlaylistUrl('');
+    setCurrentPage(1);
+    setTracksShuffled(false);
+    setShuffledOrder([]);
+  };
+
+  // El progreso y el resultado de una importación en segundo plano llegan por el WebSocket
+  useEffect(() => {
+    if (!importJobId || !importProgress || importProgress.job_id !== importJobId) return;
+    if (importProgress.status === 'done') {
+      showImportResult(importProgress);
+    } else if (importProgress.status === 'error') {
+      setImportError(importProgress.error || 'Error al importar playlist');
+    } else if (importProgress.status === 'cancelled') {
+      setImportError('Importación cancelada');
+    } else {
+      return;
+    }
+    setImportJobId(null);
+    setImporting(false);
+  }, [importProgress, importJobId]);
+
+  const handleCancelImport = async () => {
+    if (!importJobId) return;
+    try {
+      await fetch(`${API_BASE_URL}/playlist/jobs/${importJobId}/cancel?room_name=${encodeURIComponent(roomName)}`, { method: 'POST' });
+    } catch {
+      setImportError('No se pudo cancelar la importación');
+    }
+  };
+
   const handleImportPlaylist = async (e: React.FormEvent) => {
     e.preventDefault();
     const trimmedUrl = playlistUrl.trim();
@@ -165,6 +210,7 @@ export function Organizer({ roomName, password }: OrganizerProps) {
     setImporting(true);
     setImportError(null);
     setImportSuccess(null);
+    let runningInBackground = false;
 
     const isYouTube = trimmedUrl.includes('youtube.com') || trimmedUrl.includes('music.youtube.com') || trimmedUrl.includes('youtu.be');
     const useAuthEndpoint = isYouTube && youtubeAuthenticated;
@@ -198,18 +244,13 @@ export function Organizer({ roomName, password }: OrganizerProps) {
       }
 
       const data = await response.json();
-      let successMessage = `Playlist "${data.playlist_name}" importada exitosamente! ${data.total_tracks || data.tracks_count} canciones cargadas.`;
-      if (data.tracks_skipped && data.tracks_skipped > 0) {
-        successMessage += ` (${data.tracks_skipped} canciones omitidas)`;
-      }
-      if (data.requires_audio_fetch) {
-        successMessage += ' (Audio se cargará al reproducir)';
+      if (data.job_id) {
+        // La importación sigue en el servidor; el resultado llega como import_progress
+        runningInBackground = true;
+        setImportJobId(data.job_id);
+      } else {
+        showImportResult(data);
       }
-      setImportSuccess(successMessage);
-      setPlaylistUrl('');
-      setCurrentPage(1);
-      setTracksShuffled(false);
-      setShuffledOrder([]);
     } catch (error) {
       let errorMessage = 'Error desconocido';
       if (error instanceof Error) {
@@ -221,7 +262,9 @@ export function Organizer({ roomName, password }: OrganizerProps) {
       }
       setImportError(errorMessage);
     } finally {
-      setImporting(false);
+      if (!runningInBackground) {
+        setImporting(false);
+      }
     }
   };
 
@@ -230,6 +273,10 @@ export function Organizer({ roomName, password }: OrganizerProps) {
     return `${API_BASE_URL}/youtube/stream/${videoId}`;
   };
 
+  const getClipUrl = (videoId: string, seconds: number): string => {
+    return `${API_BASE_URL}/youtube/clip/${videoId}?seconds=${seconds}`;
+  };
+
   const getShuffledTracks = (): Track[] => {
     if (!gameState) return [];
     if (tracksShuffled && shuffledOrder.length > 0) {
@@ -401,6 +448,16 @@ export function Organizer({ roomName, password }: OrganizerProps) {
             {importing ? 'Importando...' : 'Importar Playlist'}
           </button>
         </form>
+        {importJobId && (
+          <div className="import-progress">
+            <p>
+              {importProgress?.job_id === importJobId ? importProgress.stage : 'En cola'}
+              {importProgress?.job_id === importJobId && importProgress.total > 0 &&
+                ` (${importProgress.resolved + importProgress.skipped}/${importProgress.total})`}
+            </p>
+            <button type="button" onClick={handleCancelImport}>Cancelar</button>
+          </div>
+        )}
         {importError && (
           <div className="error-message">
             <p>{importError}</p>
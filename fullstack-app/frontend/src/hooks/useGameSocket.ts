@@ -1,20 +1,59 @@
 import { useEffect, useRef, useState, useCallback } from 'react';
-import { GameState, Player, ControlAction } from '../types';
+import { GameState, Player, ControlAction, ImportJob } from '../types';
 
 const WS_URL = process.env.REACT_APP_WS_URL || 'ws://localhost:8000/ws/sala';
 
+export type PatchOp =
+  | { op: 'player_added'; player: Player; rejoin: boolean }
+  | { op: 'player_removed'; playerId: string }
+  | { op: 'score'; playerId: string; score: number }
+  | { op: 'buzz_queue'; queue: string[] }
+  | { op: 'status'; status: GameState['status'] }
+  | { op: 'current_track'; currentTrackId: string | null };
+
 export type GameSocketMessage =
   | { type: 'state'; payload: GameState }
-  | { type: 'player_join'; payload: Player }
-  | { type: 'player_leave'; payload: { playerId: string } }
-  | { type: 'buzzer'; payload: { queue: string[] } }
-  | { type: 'control'; payload: { status: string } }
-  | { type: 'scores'; payload: { players: Record<string, Player> } }
-  | { type: 'track_changed'; payload: { currentTrackId: string } }
-  | { type: 'join_ack'; payload: { playerId: string | null; isReused?: boolean } }
+  | { type: 'patch'; payload: { version: number; ops: PatchOp[] } }
+  | { type: 'join_ack'; payload: { playerId: string | null; isReused?: boolean; ticket?: string | null } }
   | { type: 'join_error'; payload: { message: string } }
   | { type: 'point_awarded'; payload: { playerId: string; playerName: string; points: number; track: { title: string; artist: string } } }
-  | { type: 'player_rejoin'; payload: Player };
+  | { type: 'player_banned'; payload: { playerId: string; playerName: string } }
+  | { type: 'import_progress'; payload: ImportJob }
+  | { type: 'events'; payload: { events: GameSocketMessage[] } };
+
+function applyPatchOps(state: GameState, ops: PatchOp[], version: number): GameState {
+  let next: GameState = { ...state, version };
+  for (const op of ops) {
+    switch (op.op) {
+      case 'player_added':
+        next = { ...next, players: { ...next.players, [op.player.id]: op.player } };
+        break;
+      case 'player_removed': {
+        const players = { ...next.players };
+        delete players[op.playerId];
+        next = { ...next, players, buzz_queue: next.buzz_queue.filter(id => id !== op.playerId) };
+        break;
+      }
+      case 'score': {
+        const player = next.players[op.playerId];
+        if (player) {
+          next = { ...next, players: { ...next.players, [op.playerId]: { ...player, score: op.score } } };
+        }
+        break;
+      }
+      case 'buzz_queue':
+        next = { ...next, buzz_queue: op.queue };
+        break;
+      case 'status':
+        next = { ...next, status: op.status };
+        break;
+      case 'current_track':
+        next = { ...next, current_track_id: op.currentTrackId };
+        break;
+    }
+  }
+  return next;
+}
 
 export function useGameSocket() {
   const [connected, setConnected] = useState(false);
@@ -22,12 +61,17 @@ export function useGameSocket() {
   const [playerId, setPlayerId] = useState<string | null>(null);
   const [lastPointAwarded, setLastPointAwarded] = useState<{ playerId: string; playerName: string; points: number; track: { title: string; artist: string } } | null>(null);
   const [joinError, setJoinError] = useState<string | null>(null);
+  const [importProgress, setImportProgress] = useState<ImportJob | null>(null);
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
   const pointAwardedTimeoutRef = useRef<NodeJS.Timeout | null>(null);
   const joinErrorRef = useRef<string | null>(null);
   const connectParamsRef = useRef<{ name: string; role: 'player' | 'organizer'; roomName: string; password: string } | null>(null);
   const isConnectingRef = useRef<boolean>(false);
+  // Última versión de estado aplicada (null hasta recibir el primer snapshot)
+  const versionRef = useRef<number | null>(null);
+  // Ticket firmado que entrega el servidor al unirse; permite reconectar sin verificar la contraseña
+  const ticketRef = useRef<string | null>(null);
 
   const connect = useCallback((name: string, role: 'player' | 'organizer' = 'player', roomName: string, password: string) => {
     if (isConnectingRef.current || (wsRef.current && wsRef.current.readyState === WebSocket.CONNECTING)) {
@@ -39,6 +83,10 @@ export function useGameSocket() {
     }
 
     isConnectingRef.current = true;
+    const previousParams = connectParamsRef.current;
+    if (!previousParams || previousParams.name !== name || previousParams.role !== role || previousParams.roomName !== roomName) {
+      ticketRef.current = null;
+    }
     connectParamsRef.current = { name, role, roomName, password };
     
     if (wsRef.current) {
@@ -57,6 +105,7 @@ export function useGameSocket() {
 
     setJoinError(null);
     joinErrorRef.current = null;
+    versionRef.current = null;
     setConnected(false);
 
     const ws = new WebSocket(WS_URL);
@@ -65,14 +114,16 @@ export function useGameSocket() {
     ws.onopen = () => {
       setConnected(true);
       isConnectingRef.current = false;
-      const joinMessage = { type: 'join', name, role, room_name: roomName, password: password };
+      const joinMessage = { type: 'join', name, role, room_name: roomName, password: password, ticket: ticketRef.current };
       ws.send(JSON.stringify(joinMessage));
     };
 
-    ws.onmessage = (event) => {
-      const message: GameSocketMessage = JSON.parse(event.data);
-      
+    const handleMessage = (message: GameSocketMessage) => {
       switch (message.type) {
+        case 'events':
+          // Todas las consecuencias de un cambio llegan juntas; React agrupa los renders
+          message.payload.events.forEach(handleMessage);
+          break;
         case 'join_ack':
           // Asegurar que wsRef.current apunte al WebSocket correcto
           if (wsRef.current !== ws) {
@@ -88,6 +139,9 @@ export function useGameSocket() {
           if (message.payload.playerId) {
             setPlayerId(message.payload.playerId);
           }
+          if (message.payload.ticket) {
+            ticketRef.current = message.payload.ticket;
+          }
           break;
         case 'join_error':
           const errorMsg = message.payload.message;
@@ -100,47 +154,25 @@ export function useGameSocket() {
             wsRef.current = null;
           }
           connectParamsRef.current = null;
+          ticketRef.current = null;
           break;
         case 'state':
+          versionRef.current = message.payload.version;
           setGameState(message.payload);
           break;
-        case 'player_join':
-        case 'player_rejoin':
-          setGameState(prev => {
-            if (!prev) return prev;
-            return {
-              ...prev,
-              players: {
-                ...prev.players,
-                [message.payload.id]: message.payload
-              }
-            };
-          });
-          break;
-        case 'player_leave':
-          setGameState(prev => {
-            if (!prev) return prev;
-            const newPlayers = { ...prev.players };
-            delete newPlayers[message.payload.playerId];
-            return {
-              ...prev,
-              players: newPlayers,
-              buzz_queue: prev.buzz_queue.filter(id => id !== message.payload.playerId)
-            };
-          });
-          break;
-        case 'buzzer':
-          setGameState(prev => prev ? { ...prev, buzz_queue: message.payload.queue } : null);
-          break;
-        case 'control':
-          setGameState(prev => prev ? { ...prev, status: message.payload.status as GameState['status'] } : null);
-          break;
-        case 'scores':
-          setGameState(prev => prev ? { ...prev, players: message.payload.players } : null);
-          break;
-        case 'track_changed':
-          setGameState(prev => prev ? { ...prev, current_track_id: message.payload.currentTrackId } : null);
+        case 'patch': {
+          const { version, ops } = message.payload;
+          // Sin snapshot todavía, o patch viejo: ignorar
+          if (versionRef.current === null || version <= versionRef.current) break;
+          if (version !== versionRef.current + 1) {
+            // Se perdieron versiones: pedir los patches faltantes o un snapshot
+            ws.send(JSON.stringify({ type: 'sync', version: versionRef.current }));
+            break;
+          }
+          versionRef.current = version;
+          setGameState(prev => prev ? applyPatchOps(prev, ops, version) : prev);
           break;
+        }
         case 'point_awarded':
           if (pointAwardedTimeoutRef.current) {
             clearTimeout(pointAwardedTimeoutRef.current);
@@ -151,9 +183,16 @@ export function useGameSocket() {
             pointAwardedTimeoutRef.current = null;
           }, 5000);
           break;
+        case 'import_progress':
+          setImportProgress(message.payload);
+          break;
       }
     };
 
+    ws.onmessage = (event) => {
+      handleMessage(JSON.parse(event.data));
+    };
+
     ws.onerror = (error) => {
       console.error('[WebSocket] Error en WebSocket:', error);
     };
@@ -189,12 +228,14 @@ export function useGameSocket() {
       reconnectTimeoutRef.current = null;
     }
     connectParamsRef.current = null;
+    ticketRef.current = null;
     isConnectingRef.current = false;
     joinErrorRef.current = null;
     wsRef.current?.close();
     wsRef.current = null;
     setConnected(false);
     setPlayerId(null);
+    versionRef.current = null;
     setGameState(null);
     setJoinError(null);
   }, []);
@@ -252,6 +293,7 @@ export function useGameSocket() {
     playerId,
     lastPointAwarded,
     joinError,
+    importProgress,
     connect,
     disconnect,
     buzz,
@@ -15,6 +15,7 @@ export type Player = {
 };
 
 export type GameState = {
+  version: number;
   tracks: Track[];
   track_order: string[];
   current_track_id: string | null;
@@ -23,4 +24,21 @@ export type GameState = {
   players: Record<string, Player>;
 };
 
+export type ImportJob = {
+  job_id: string;
+  status: "pending" | "running" | "done" | "error" | "cancelled";
+  stage: string;
+  source: "spotify" | "youtube";
+  room_names: (string | null)[];
+  total: number;
+  resolved: number;
+  skipped: number;
+  error: string | null;
+  message?: string;
+  playlist_name?: string;
+  tracks_count?: number;
+  tracks_skipped?: number;
+  requires_audio_fetch?: boolean;
+};
+
 export type ControlAction = "play" | "pause" | "stop" | "preview2" | "preview5";